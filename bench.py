@@ -0,0 +1,504 @@
+import argparse
+import json
+import os
+import random
+import tempfile
+import time
+
+from mod2 import Assets, CampusManagementSystem, Courses, Enrollment, ShardedCampusSystem, Student, time_to_minutes
+
+PROGRAMS = ["Computer Science", "Software Engineering", "Mathematics", "Physics", "Economics", "Law"]
+COURSE_PREFIXES = ["CSE", "SEN", "MAT", "PHY", "CHE", "BIO", "ECO", "ENG", "HIS", "LAW", "ACC", "STA"]
+DAYS = ["Monday", "Tuesday", "Wednesday", "Thursday", "Friday"]
+ASSET_TYPES = ["ROOM", "LAB", "PROJECTOR", "VEHICLE"]
+SEMESTER = "2024A"
+
+
+def student_id_for(i):
+    return f"PCOS-{i // 10000 % 100:02d}-01-{i % 10000:04d}"
+
+
+def course_code_for(i):
+    return f"{COURSE_PREFIXES[i // 1000 % len(COURSE_PREFIXES)]}{i % 1000:03d}"
+
+
+def booking_window(day, hour, hours=1):
+    return f"{day:02d}-09-2024 {hour:02d}:00", f"{day:02d}-09-2024 {hour + hours:02d}:00"
+
+
+def build_synthetic_campus(student_count=1000, course_count=None, courses_per_student=4, asset_count=None,
+                           bookings_per_asset=5, payments_per_student=2, seed=0):
+    rng = random.Random(seed)
+    if course_count is None:
+        course_count = max(10, student_count * courses_per_student // 40)
+    if asset_count is None:
+        asset_count = max(10, student_count // 50)
+
+    cms = CampusManagementSystem()
+    lecturers = [f"LECT_{i:04d}" for i in range(max(1, course_count // 3))]
+
+    for i in range(course_count):
+        cms.add_course({
+            "code": course_code_for(i),
+            "title": f"Synthetic Course {i}",
+            "instructor": rng.choice(lecturers),
+            "credits": rng.choice([2, 3, 4]),
+            "max_capacity": 60,
+            "fee": rng.choice([50000, 70000, 75000])
+        })
+        course = cms.course_catalog[course_code_for(i)]
+        for session in range(rng.randint(1, 2)):
+            start_hour = rng.randint(8, 15)
+            course.add_schedule(rng.choice(DAYS), f"{start_hour:02d}:00",
+                                f"{start_hour + rng.randint(1, 3):02d}:00", f"ROOM_{rng.randrange(asset_count):04d}")
+
+    for i in range(asset_count):
+        asset_type = ASSET_TYPES[0] if i % 2 == 0 else rng.choice(ASSET_TYPES)
+        cms.add_asset(Assets(f"ROOM_{i:04d}", f"Asset {i}", asset_type, f"Block {i % 10}",
+                             capacity=rng.choice([30, 60, 120])))
+
+    course_codes = list(cms.course_catalog)
+    for i in range(student_count):
+        student_id = student_id_for(i)
+        cms.add_student({
+            "student_id": student_id,
+            "name": f"Student {i}",
+            "email": f"student{i}@picos.edu",
+            "program": rng.choice(PROGRAMS),
+            "admission_year": rng.choice([2021, 2022, 2023, 2024])
+        })
+        for course_code in rng.sample(course_codes, min(courses_per_student, len(course_codes))):
+            cms.enroll_student_in_course(student_id, course_code, SEMESTER)
+        for payment in range(payments_per_student):
+            cms.process_student_payment(student_id, rng.randint(5, 50) * 1000, f"{rng.randint(1, 28):02d}-09-2024")
+
+    student_ids = list(cms.student_records)
+    for asset_id in cms.asset_records:
+        for booking in range(bookings_per_asset):
+            start_time, end_time = booking_window(rng.randint(1, 28), rng.randint(8, 18))
+            cms.book_campus_asset(asset_id, rng.choice(student_ids), start_time, end_time)
+
+    return cms
+
+
+def _result(scale, operation, ops, seconds):
+    return {
+        "scale": scale,
+        "operation": operation,
+        "ops": ops,
+        "seconds": round(seconds, 6),
+        "ops_per_sec": round(ops / seconds, 1) if seconds > 0 else None,
+        "us_per_op": round(seconds / ops * 1e6, 3) if ops else None
+    }
+
+
+def _timed(operation_calls):
+    start = time.perf_counter()
+    for call, args in operation_calls:
+        call(*args)
+    return time.perf_counter() - start
+
+
+def run_benchmarks(scale, seed=0, sample_size=10000):
+    rng = random.Random(seed + 1)
+    results = []
+
+    start = time.perf_counter()
+    cms = build_synthetic_campus(student_count=scale, seed=seed)
+    results.append(_result(scale, "build", scale, time.perf_counter() - start))
+
+    student_ids = list(cms.student_records)
+    course_codes = list(cms.course_catalog)
+    asset_ids = list(cms.asset_records)
+    sample = [rng.choice(student_ids) for _ in range(min(sample_size, scale))]
+
+    calls = [(cms.enroll_student_in_course, (student_id, rng.choice(course_codes), "2025A")) for student_id in sample]
+    results.append(_result(scale, "enroll", len(calls), _timed(calls)))
+
+    new_enrollments = [enrollment for key, enrollment in cms.enrollment_records.items() if key.endswith("_2025A")]
+    calls = [(cms.enrollment_service.withdraw_enrollment, (enrollment,)) for enrollment in new_enrollments]
+    results.append(_result(scale, "withdraw", len(calls), _timed(calls)))
+
+    calls = []
+    graded = 0
+    for course_code in course_codes:
+        course = cms.course_catalog[course_code]
+        grade_data = [{"student_id": student_id, "grade": rng.choice("ABCDF")} for student_id in course.current_enrollment]
+        calls.append((cms.process_grade_submission, (course.lecturer, course_code, grade_data)))
+        graded += len(grade_data)
+        if graded >= sample_size:
+            break
+    results.append(_result(scale, "grade", graded, _timed(calls)))
+
+    calls = [(cms.process_student_payment, (student_id, 1000, "15-10-2024")) for student_id in sample]
+    results.append(_result(scale, "pay", len(calls), _timed(calls)))
+
+    calls = []
+    for i in range(len(sample)):
+        start_time, end_time = booking_window(rng.randint(1, 28), rng.randint(8, 18))
+        calls.append((cms.book_campus_asset, (rng.choice(asset_ids), sample[i], start_time, end_time)))
+    results.append(_result(scale, "book", len(calls), _timed(calls)))
+
+    calls = [(cms.generate_student_report, (student_id,)) for student_id in sample]
+    calls += [(cms.generate_course_report, (rng.choice(course_codes),)) for _ in sample]
+    results.append(_result(scale, "report", len(calls), _timed(calls)))
+
+    pairs = [(cms.course_catalog[rng.choice(course_codes)], cms.course_catalog[rng.choice(course_codes)]) for _ in sample]
+    calls = [(first.has_schedule_conflict, (second,)) for first, second in pairs]
+    results.append(_result(scale, "schedule_conflict", len(calls), _timed(calls)))
+
+    return results
+
+
+def _measure(calls):
+    import tracemalloc
+
+    tracemalloc.start()
+    start = time.perf_counter()
+    outcomes = [call(*args, **kwargs) for call, args, kwargs in calls]
+    elapsed = time.perf_counter() - start
+    allocated = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    del outcomes
+    return elapsed, allocated
+
+
+def bench_result_modes(student_count=10000, seed=0):
+    results = []
+    for mode, lean in (("tuple", False), ("lean", True)):
+        cms = build_synthetic_campus(student_count=student_count, course_count=max(10, student_count // 40),
+                                     courses_per_student=0, payments_per_student=0, seed=seed)
+        course_codes = list(cms.course_catalog)
+        student_ids = list(cms.student_records)
+
+        calls = [(cms.enroll_student_in_course, (student_id, course_codes[i % len(course_codes)], "2025A"), {"lean": lean})
+                 for i, student_id in enumerate(student_ids)]
+        elapsed, allocated = _measure(calls)
+        result = _result(student_count, f"bulk_enroll_{mode}", len(calls), elapsed)
+        result["peak_bytes"] = allocated
+        results.append(result)
+
+        calls = [(cms.process_student_payment, (student_id, 1000, "15-10-2024"), {"lean": lean})
+                 for student_id in student_ids for _ in range(5)]
+        elapsed, allocated = _measure(calls)
+        result = _result(student_count, f"bulk_pay_{mode}", len(calls), elapsed)
+        result["peak_bytes"] = allocated
+        results.append(result)
+    return results
+
+
+def bench_asset_analytics(booking_count=1000000, asset_count=500, seed=0):
+    rng = random.Random(seed)
+    cms = CampusManagementSystem()
+    for i in range(asset_count):
+        cms.add_asset(Assets(f"ASSET_{i:04d}", f"Asset {i}", ASSET_TYPES[i % len(ASSET_TYPES)], f"Block {i % 10}"))
+    assets = list(cms.asset_records.values())
+    for i in range(booking_count):
+        start_time, end_time = booking_window(rng.randint(1, 28), rng.randint(8, 18), rng.randint(1, 3))
+        start_time = start_time.replace("-09-2024", f"-{rng.randint(1, 12):02d}-{rng.randint(2021, 2024)}")
+        end_time = start_time[:11] + end_time[11:]
+        booking = rng.choice(assets)._add_booking(student_id_for(i % 50000), start_time, end_time)
+        roll = rng.random()
+        if roll < 0.8:
+            booking['status'] = "COMPLETED"
+            booking['condition'] = "DAMAGED" if roll < 0.02 else "GOOD"
+
+    start = time.perf_counter()
+    cms.asset_analytics.refresh()
+    ingest_time = time.perf_counter() - start
+
+    for asset in assets[:50]:
+        asset._add_booking("PCOS-01-01-0001", "02-01-2025 10:00", "02-01-2025 11:00")
+        asset.check_in("PCOS-01-01-0001")
+        asset.check_out("PCOS-01-01-0001", "DAMAGED")
+
+    start = time.perf_counter()
+    cms.generate_asset_analytics_report({"ROOM": 500, "LAB": 1500, "PROJECTOR": 200, "VEHICLE": 3000}, "01-01-2025 00:00")
+    report_time = time.perf_counter() - start
+    return [_result(booking_count, "asset_analytics_ingest", booking_count, ingest_time),
+            _result(booking_count, "asset_analytics_report", booking_count, report_time)]
+
+
+def bench_academic_analytics(enrollment_count=1000000, student_count=100000, course_count=2000, seed=0):
+    rng = random.Random(seed)
+    cms = CampusManagementSystem()
+    for i in range(course_count):
+        code = course_code_for(i)
+        cms.course_catalog[code] = Courses(code, f"Course {code}", f"LECT_{i % 200:04d}")
+    for i in range(student_count):
+        student = Student(student_id_for(i), f"Student {i}", f"student{i}@picos.edu", "01-09-2024", PROGRAMS[i % len(PROGRAMS)])
+        student.gpa = rng.uniform(1.0, 4.0)
+        cms.student_records[student.student_id] = student
+    for i in range(enrollment_count):
+        enrollment = Enrollment(student_id_for(i % student_count), course_code_for(rng.randrange(course_count)), SEMESTER)
+        enrollment.grade = rng.choice("ABCDF")
+        enrollment.attendance_record = rng.uniform(50.0, 100.0)
+        cms.enrollment_records[enrollment.enrollment_id] = enrollment
+
+    start = time.perf_counter()
+    cms.academic_analytics.refresh()
+    ingest_time = time.perf_counter() - start
+
+    for enrollment in list(cms.enrollment_records.values())[:1000]:
+        cms.grading_service.assign_grade(enrollment.enrollment_id, "F")
+
+    start = time.perf_counter()
+    cms.generate_academic_analytics_report()
+    report_time = time.perf_counter() - start
+    return [_result(enrollment_count, "academic_analytics_ingest", enrollment_count, ingest_time),
+            _result(enrollment_count, "academic_analytics_report", enrollment_count, report_time)]
+
+
+def bench_degree_audit(student_count=50000, course_count=200, seed=0):
+    rng = random.Random(seed)
+    cms = CampusManagementSystem()
+    course_codes = [course_code_for(i) for i in range(course_count)]
+    for i, code in enumerate(course_codes):
+        prerequisites = rng.sample(course_codes[:i], min(i, 2))
+        cms.add_course({"code": code, "title": f"Course {code}", "instructor": "LECT_0001", "prerequisites": prerequisites})
+    for program in PROGRAMS:
+        cms.set_program_requirements(program, rng.sample(course_codes, 40))
+    for i in range(student_count):
+        cms.add_student({"student_id": student_id_for(i), "name": f"Student {i}", "email": f"student{i}@picos.edu",
+                         "program": PROGRAMS[i % len(PROGRAMS)], "admission_year": 2024})
+        cms.student_records[student_id_for(i)].completed_courses.extend(
+            (code, rng.choice("ABCDF")) for code in rng.sample(course_codes, 20))
+
+    graph = cms.prerequisite_graph
+    students = list(cms.student_records.values())
+    for student in students:
+        graph.completed_mask(student)
+    checks = [(graph.is_eligible, (rng.choice(students), rng.choice(course_codes))) for _ in range(100000)]
+    results = [_result(student_count, "prerequisite_check", len(checks), _timed(checks))]
+
+    start = time.perf_counter()
+    for program in PROGRAMS:
+        cms.run_degree_audit(program)
+    results.append(_result(student_count, "degree_audit", student_count, time.perf_counter() - start))
+    return results
+
+
+def bench_sharded(student_count=20000, worker_counts=(1, 2, 4), department_count=8, courses_per_department=25,
+                  batch_size=5000, seed=0):
+    results = []
+    for worker_count in worker_counts:
+        rng = random.Random(seed)
+        with ShardedCampusSystem(worker_count) as campus:
+            course_codes = []
+            for dept in range(department_count):
+                for i in range(courses_per_department):
+                    code = course_code_for(dept * courses_per_department + i)
+                    campus.add_course({"code": code, "title": f"Course {code}", "instructor": "LECT_0001",
+                                       "max_capacity": student_count}, f"{dept + 1:02d}")
+                    course_codes.append(code)
+
+            student_ids = [f"PCOS-{i % department_count + 1:02d}-01-{i // department_count % 10000:04d}"
+                           for i in range(student_count)]
+            operations = [("add_student", ({"student_id": student_id, "name": "Student", "email": f"s{i}@picos.edu",
+                                            "admission_year": 2024},)) for i, student_id in enumerate(student_ids)]
+            enrolled = {}
+            for student_id in student_ids:
+                dept = int(student_id[5:7]) - 1
+                local = course_codes[dept * courses_per_department:(dept + 1) * courses_per_department]
+                enrolled[student_id] = rng.sample(local, 3)
+                for code in enrolled[student_id]:
+                    operations.append(("enroll_student_in_course", (student_id, code, SEMESTER)))
+                if rng.random() < 0.02:
+                    operations.append(("enroll_student_in_course", (student_id, rng.choice(course_codes), SEMESTER)))
+                operations.append(("process_student_payment", (student_id, 5000, "01-09-2024")))
+            for student_id in rng.sample(student_ids, student_count // 50):
+                operations.append(("withdraw_from_course", (student_id, enrolled[student_id][0], SEMESTER)))
+
+            start = time.perf_counter()
+            for offset in range(0, len(operations), batch_size):
+                campus.execute_batch(operations[offset:offset + batch_size])
+            seconds = time.perf_counter() - start
+        result = _result(student_count, f"sharded_{worker_count}_workers", len(operations), seconds)
+        result["workers"] = worker_count
+        result["cpu_count"] = os.cpu_count()
+        result["speedup_vs_1_worker"] = round(results[0]["seconds"] / seconds, 2) if results else 1.0
+        results.append(result)
+    return results
+
+
+def bench_invoicing(student_count=50000, seed=0):
+    cms = build_synthetic_campus(student_count, bookings_per_asset=0, payments_per_student=0, seed=seed)
+    cms.invoicing_service.program_discounts = {"Law": 0.1, "Economics": 0.05}
+
+    start = time.perf_counter()
+    cms.issue_semester_invoices(SEMESTER)
+    results = [_result(student_count, "invoicing", student_count, time.perf_counter() - start)]
+
+    with tempfile.TemporaryDirectory() as directory:
+        start = time.perf_counter()
+        cms.store_invoices(os.path.join(directory, "invoices.txt"), SEMESTER)
+        results.append(_result(student_count, "store_invoices", student_count, time.perf_counter() - start))
+    return results
+
+
+def bench_search(student_count=100000, query_count=2000, seed=0):
+    rng = random.Random(seed)
+    syllables = ["an", "bo", "ka", "li", "mi", "ne", "ro", "sa", "ta", "vu", "zo", "el", "ju", "de", "fa", "ku", "ri", "po"]
+
+    def make_name():
+        return "".join(rng.choice(syllables) for _ in range(rng.randint(2, 4))).title()
+
+    cms = CampusManagementSystem()
+    for i in range(student_count):
+        first, last = make_name(), make_name()
+        cms.add_student({"student_id": student_id_for(i), "name": f"{first} {last}",
+                         "email": f"{first.lower()}.{last.lower()}{i}@picos.edu",
+                         "program": rng.choice(PROGRAMS), "admission_year": 2024})
+    cms.search_students("warmup")
+
+    students = rng.sample(list(cms.student_records.values()), query_count)
+    prefix_queries = [(cms.search_students, (student.name.split()[0][:4], 10, False)) for student in students]
+    full_queries = [(cms.search_students, (student.name, 10)) for student in students]
+    fuzzy_queries = [(cms.search_students, (student.name.split()[1][1:] + "x", 10)) for student in students]
+    return [_result(student_count, "search_prefix", query_count, _timed(prefix_queries)),
+            _result(student_count, "search_full_name", query_count, _timed(full_queries)),
+            _result(student_count, "search_fuzzy", query_count, _timed(fuzzy_queries))]
+
+
+def bench_events(payment_count=200000, student_count=1000):
+    results = []
+    for mode in ("events_off", "events_ring", "events_file_sink"):
+        cms = build_synthetic_campus(student_count, bookings_per_asset=0, payments_per_student=0)
+        student_ids = list(cms.student_records)
+        with tempfile.TemporaryDirectory() as directory:
+            if mode != "events_off":
+                cms.enable_events()
+            if mode == "events_file_sink":
+                cms.add_event_file_sink(os.path.join(directory, "events.jsonl"), batch_size=1000)
+            payments = [(cms.process_student_payment, (student_ids[i % student_count], 1000, "01-09-2024"))
+                        for i in range(payment_count)]
+            seconds = _timed(payments)
+            if mode != "events_off":
+                cms.disable_events()
+        results.append(_result(student_count, f"payment_{mode}", payment_count, seconds))
+    return results
+
+
+def bench_attendance(student_count=10000, weeks=14, attendance_rate=0.8, seed=0):
+    from datetime import datetime, timedelta
+
+    rng = random.Random(seed)
+    cms = build_synthetic_campus(student_count, bookings_per_asset=0, payments_per_student=0, seed=seed)
+    cms.set_term_dates("02-09-2024", weeks)
+    first_day = datetime(2024, 9, 2)
+
+    with tempfile.TemporaryDirectory() as directory:
+        filename = os.path.join(directory, "card_reader.csv")
+        swipes = 0
+        with open(filename, "w") as file:
+            file.write("student_id,timestamp,reader\n")
+            for student in cms.student_records.values():
+                for course_code in student.enrolled_courses:
+                    for day, start_time, end_time, venue in cms.course_catalog[course_code].schedule:
+                        start = first_day + timedelta(days=DAYS.index(day), minutes=time_to_minutes(start_time))
+                        for week in range(weeks):
+                            if rng.random() < attendance_rate:
+                                swipe = start + timedelta(days=week * 7, minutes=-rng.randint(0, 9))
+                                file.write(f"{student.student_id},{swipe.strftime('%d-%m-%Y %H:%M')},{venue}\n")
+                                swipes += 1
+
+        start = time.perf_counter()
+        cms.ingest_attendance_log(filename)
+        results = [_result(student_count, "attendance_ingest", swipes, time.perf_counter() - start)]
+
+    start = time.perf_counter()
+    cms.update_attendance_records()
+    results.append(_result(student_count, "attendance_update", len(cms.enrollment_records), time.perf_counter() - start))
+    results[-1]["bytes_per_enrollment"] = round(cms.attendance_service.memory_usage() / len(cms.enrollment_records), 2)
+    return results
+
+
+def bench_payroll(staff_count=5000):
+    cms = CampusManagementSystem()
+    for i in range(staff_count):
+        cms.add_staff({
+            "staff_id": f"STF-{i:06d}",
+            "name": f"Staff {i}",
+            "email": f"staff{i}@picos.edu",
+            "department": f"DEPT{i % 12:02d}",
+            "basic_salary": 30000 + (i % 50) * 1500,
+            "allowances": {"house": 8000, "transport": 3000 + (i % 7) * 500},
+            "deductions": {"sacco": 2000 if i % 3 == 0 else 0}
+        })
+
+    start = time.perf_counter()
+    cms.run_monthly_payroll(1, 2025)
+    run_time = time.perf_counter() - start
+
+    with tempfile.TemporaryDirectory() as directory:
+        start = time.perf_counter()
+        cms.store_payslips("01-2025", os.path.join(directory, "payslips.txt"))
+        store_time = time.perf_counter() - start
+
+    return [_result(staff_count, "payroll_run", staff_count, run_time),
+            _result(staff_count, "payslip_store", staff_count, store_time)]
+
+
+def bench_timetable(section_count=2000, students_per_section=10):
+    cms = CampusManagementSystem()
+    room_count = max(10, section_count // 10)
+    for i in range(room_count):
+        cms.add_asset(Assets(f"ROOM_{i:04d}", f"Room {i}", "ROOM", f"Block {i % 8}", capacity=30 + (i % 4) * 30))
+    for i in range(section_count):
+        cms.add_course({
+            "code": course_code_for(i),
+            "title": f"Section {i}",
+            "instructor": f"LECT_{i % (section_count // 3 + 1):04d}",
+            "credits": 2 + i % 2,
+            "max_capacity": 25 + (i % 5) * 20
+        })
+    codes = list(cms.course_catalog)
+    for i in range(section_count * students_per_section // 4):
+        student_id = student_id_for(i)
+        cms.add_student({"student_id": student_id, "name": f"Student {i}", "email": f"s{i}@picos.edu", "admission_year": 2024})
+        student = cms.student_records[student_id]
+        for k in range(4):
+            student.enrolled_courses.append(codes[(i * 7 + k * 131) % len(codes)])
+
+    start = time.perf_counter()
+    cms.generate_timetable()
+    return [_result(section_count, "timetable", section_count, time.perf_counter() - start)]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark PCOS core campus operations")
+    parser.add_argument("--scales", type=int, nargs="+", default=[1000, 10000, 100000])
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--sample-size", type=int, default=10000)
+    parser.add_argument("--output", help="write JSON lines to this file instead of stdout")
+    parser.add_argument("--skip-extras", action="store_true", help="skip payroll and timetable benchmarks")
+    args = parser.parse_args()
+
+    results = []
+    for scale in args.scales:
+        results.extend(run_benchmarks(scale, args.seed, args.sample_size))
+    if not args.skip_extras:
+        results.extend(bench_result_modes(10000, args.seed))
+        results.extend(bench_asset_analytics(1000000, seed=args.seed))
+        results.extend(bench_academic_analytics(1000000, seed=args.seed))
+        results.extend(bench_degree_audit(50000, seed=args.seed))
+        results.extend(bench_sharded(20000, seed=args.seed))
+        results.extend(bench_invoicing(50000, seed=args.seed))
+        results.extend(bench_search(100000, seed=args.seed))
+        results.extend(bench_events(200000))
+        results.extend(bench_attendance(10000, seed=args.seed))
+        for staff_count in (1000, 20000):
+            results.extend(bench_payroll(staff_count))
+        for section_count in (500, 5000):
+            results.extend(bench_timetable(section_count))
+
+    lines = "".join(json.dumps(result) + "\n" for result in results)
+    if args.output:
+        with open(args.output, "w") as file:
+            file.write(lines)
+    else:
+        print(lines, end="")
+
+
+if __name__ == "__main__":
+    main()
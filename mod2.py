@@ -7,6 +7,7 @@ Data validation and constraints
 This is the core logic of PCOS.
 If this module is weak, the system is meaningless.'''
 
+from enum import IntEnum
 
 
 
@@ -62,6 +63,47 @@ def parse_date(date_str):
 def date_to_string(day, month, year):
     return f"{day:02d}-{month:02d}-{year:04d}"
     
+DAY_ORDER = {"mon": 0, "tue": 1, "wed": 2, "thu": 3, "fri": 4, "sat": 5, "sun": 6}
+
+def time_to_minutes(time_str):
+    hours, minutes = map(int, time_str.split(":"))
+    return hours * 60 + minutes
+
+def parse_datetime(datetime_str):
+    from datetime import datetime
+    return datetime.strptime(datetime_str, "%d-%m-%Y %H:%M")
+
+def expand_recurrence(start_time, end_time, freq="WEEKLY", count=None, until=None, interval=1, by_day=None):
+    from datetime import timedelta
+
+    weekdays = ["MO", "TU", "WE", "TH", "FR", "SA", "SU"]
+    first_start = parse_datetime(start_time)
+    duration = parse_datetime(end_time) - first_start
+    if duration.total_seconds() <= 0:
+        raise ValueError("End time must be after start time!")
+    last_start = parse_datetime(until) if until else None
+    if count is None and last_start is None:
+        raise ValueError("Recurrence needs a count or an until date!")
+    if freq not in ["DAILY", "WEEKLY"]:
+        raise ValueError(f"Unsupported recurrence frequency: {freq}!")
+
+    if freq == "WEEKLY" and by_day:
+        offsets = sorted((weekdays.index(day) - first_start.weekday()) % 7 for day in by_day)
+        step = timedelta(weeks=interval)
+    else:
+        offsets = [0]
+        step = timedelta(days=interval) if freq == "DAILY" else timedelta(weeks=interval)
+
+    occurrences = []
+    period_start = first_start
+    while True:
+        for offset in offsets:
+            start = period_start + timedelta(days=offset)
+            if (last_start and start > last_start) or (count is not None and len(occurrences) >= count):
+                return occurrences
+            occurrences.append((start.strftime("%d-%m-%Y %H:%M"), (start + duration).strftime("%d-%m-%Y %H:%M")))
+        period_start += step
+
 def is_date_before(date1, date2):
     d1, m1, y1 = date1
     d2, m2, y2 = date2
@@ -71,6 +113,42 @@ def is_date_before(date1, date2):
         return m1 < m2
     return d1 < d2
 
+class Status(IntEnum):
+    OK = 0
+    NOT_FOUND = 1
+    DUPLICATE = 2
+    FULL = 3
+    INVALID = 4
+    UNAVAILABLE = 5
+    PREREQUISITE = 6
+
+class Result:
+    __slots__ = ("status", "template", "args", "value")
+
+    def __init__(self, status, template, args=(), value=None):
+        self.status = status
+        self.template = template
+        self.args = args
+        self.value = value
+
+    def __bool__(self):
+        return self.status == Status.OK
+
+    @property
+    def message(self):
+        return self.template.format(*self.args)
+
+    def __str__(self):
+        return self.message
+
+    def __repr__(self):
+        return f"Result({self.status.name}, {self.message!r})"
+
+def make_result(lean, status, template, *args, value=None):
+    if lean:
+        return Result(status, template, args, value)
+    return status == Status.OK, template.format(*args)
+
 class Courses:
     def __init__(self, course_code, course_name, lecturer="", fee=0):
         self.course_code = course_code
@@ -81,6 +159,9 @@ class Courses:
         self.fee = fee
         self.credits = 0  
         self.max_capacity = 30  
+        self.prerequisites = []
+        self.version = 0
+        self.schedule_version = 0
 
         valid, message = self._validate()  
         if not valid:
@@ -97,6 +178,8 @@ class Courses:
     
     def assign_lecturer(self, lecturer):
         self.lecturer = lecturer
+        self.version += 1
+        self.schedule_version += 1
         return f"Lecturer {lecturer} assigned to course {self.course_code}."
         
     def add_schedule(self, day, start_time, end_time, venue):
@@ -121,21 +204,22 @@ class Courses:
             return False, f"Schedule error: {e}"
         
         self.schedule.append((day, start_time, end_time, venue))
+        self.version += 1
+        self.schedule_version += 1
         return True, "Schedule added successfully"
     
-    def _calculate_fee(self):
-        base_fee = 50000
-        if self.course_code.startswith("CS"):
-            return base_fee + 20000
-        elif self.course_code.startswith("SE"):
-            return base_fee + 25000
-        else:
-            return base_fee
+    def _calculate_fee(self, base_fee=50000, surcharges=None):
+        if surcharges is None:
+            surcharges = {"CS": 20000, "SE": 25000}
+        for prefix, surcharge in surcharges.items():
+            if self.course_code.startswith(prefix):
+                return base_fee + surcharge
+        return base_fee
     
     def has_schedule_conflict(self, other_course):
         for day1, start1, end1, venue1 in self.schedule:
             for day2, start2, end2, venue2 in other_course.schedule:
-                if day1 == day2:
+                if DAY_ORDER.get(day1[:3].lower(), day1) == DAY_ORDER.get(day2[:3].lower(), day2):
                     start1_h, start1_m = map(int, start1.split(":"))
                     end1_h, end1_m = map(int, end1.split(":"))
                     start2_h, start2_m = map(int, start2.split(":"))
@@ -150,13 +234,14 @@ class Courses:
                         return True
         return False
     
-    def enroll_student(self, student_id):
+    def enroll_student(self, student_id, lean=False):
         if student_id in self.current_enrollment:
-            return False, f"Student {student_id} is already enrolled in {self.course_code}."
+            return make_result(lean, Status.DUPLICATE, "Student {0} is already enrolled in {1}.", student_id, self.course_code)
         if len(self.current_enrollment) >= self.max_capacity:
-            return False, f"Course {self.course_code} is full."
+            return make_result(lean, Status.FULL, "Course {0} is full.", self.course_code)
         self.current_enrollment.append(student_id)
-        return True, f"Student {student_id} enrolled in course {self.course_code}."
+        self.version += 1
+        return make_result(lean, Status.OK, "Student {0} enrolled in course {1}.", student_id, self.course_code)
     
     def get_available_seats(self): 
         return self.max_capacity - len(self.current_enrollment)
@@ -197,6 +282,9 @@ class Student:
         self.gpa = 0.0  
         self.tuition_balance = 0.0
         self.completed_courses = []  
+        self.grade_positions = {}
+        self.grade_version = 0
+        self.version = 0
 
         valid, message = self.validate()
         if not valid:
@@ -211,27 +299,31 @@ class Student:
             return False, msg_email
         return True, "Valid student data!"
     
-    def enroll_in_course(self, course):
-        success, message = course.enroll_student(self.student_id)  
-        if success:
+    def enroll_in_course(self, course, lean=False):
+        result = course.enroll_student(self.student_id, lean=True)
+        if result:
             self.enrolled_courses.append(course.course_code)
-            return True, f"Student {self.student_id} successfully enrolled in {course.course_code}."
-        return False, f"Enrollment failed for student {self.student_id} in {course.course_code}: {message}"
+            self.version += 1
+            return make_result(lean, Status.OK, "Student {0} successfully enrolled in {1}.", self.student_id, course.course_code)
+        return make_result(lean, result.status, "Enrollment failed for student {0} in {1}: {2}",
+                           self.student_id, course.course_code, result)
 
     def list_enrolled_courses(self):
         return self.enrolled_courses
     
-    def pay_fees(self, amount, date_str):
+    def pay_fees(self, amount, date_str, lean=False):
         if amount <= 0:
-            return False, "Payment amount must be positive."
+            return make_result(lean, Status.INVALID, "Payment amount must be positive.")
         self.fees_paid += amount
         self.balance -= amount
         self.tuition_balance -= amount  
         self.payment_history.append((amount, date_str))
-        return True, f"Student {self.student_id} paid {amount} on {date_str}."
+        self.version += 1
+        return make_result(lean, Status.OK, "Student {0} paid {1} on {2}.", self.student_id, amount, date_str)
     
     def calculate_balance(self, total_fees):
         self.balance = total_fees - self.fees_paid
+        self.version += 1
         return self.balance
     
     def get_current_semester_credits(self):
@@ -259,10 +351,22 @@ class Student:
                 total_credits += credits
         
         self.gpa = round(total_points / total_credits, 2) if total_credits > 0 else 0.0
+        self.version += 1
         return self.gpa
     
+    def record_grade(self, course_code, semester, grade):
+        position = self.grade_positions.get((course_code, semester))
+        if position is None:
+            self.grade_positions[(course_code, semester)] = len(self.completed_courses)
+            self.completed_courses.append((course_code, grade))
+        else:
+            self.completed_courses[position] = (course_code, grade)
+        self.grade_version += 1
+        self.version += 1
+
     def add_tuition_fee(self, amount):  
         self.tuition_balance += amount
+        self.version += 1
         return self.tuition_balance
     
     def store_student_data(self, filename):
@@ -305,9 +409,13 @@ class Enrollment:
         self.final_grade_value = None  
         self.assignments = []
 
+    _id_counter = 0
+    _id_prefix = "ENR"
+
     def _generate_id(self):
         import time
-        return f"ENR-{int(time.time())}"
+        Enrollment._id_counter += 1
+        return f"{Enrollment._id_prefix}-{int(time.time())}-{Enrollment._id_counter:06d}"
     
     def _get_current_date(self):
         from datetime import datetime
@@ -379,68 +487,149 @@ class Enrollment:
             return f"Error storing enrollment data: {e}"
 
 class Assets:
-    def __init__(self, asset_id, name, type, location):
+    _booking_counter = 0
+
+    def __init__(self, asset_id, name, type, location, capacity=0):
         self.asset_id = asset_id
         self.name = name
         self.type = type
         self.location = location
+        self.capacity = capacity
         self.status = "AVAILABLE"
         self.bookings = []  
         self.maintenance_records = []
+        self.booking_changes = []
+        self.booking_index = {}
+        self.user_booking_index = {}
+        self.active_booking_ends = []
+        self.booking_spans = []
+        self.busy_spans = []
+        self.busy_key = (0, 0, 0)
         self.deposit_amount = 0.0
 
     def is_available(self, start_time, end_time):
-        if self.status in ["MAINTENANCE", "UNAVAILABLE"]:
-            return False
-
-        for booking in self.bookings:  
-            if booking['status'] in ["ACTIVE", "ONGOING"]:
-                if not (end_time <= booking['start_time'] or start_time >= booking['end_time']):
-                    return False
+        return not self.find_conflicts([(start_time, end_time)])
 
-        for maintenance in self.maintenance_records:
-            if not (end_time <= maintenance['start_time'] or start_time >= maintenance['end_time']):
-                return False
-        return True
-
-    def book_asset(self, user_id, start_time, end_time):
-        if not self.is_available(start_time, end_time):  
-            return False, f"Asset {self.asset_id} is not available from {start_time} to {end_time}."
+    def book_asset(self, user_id, start_time, end_time, lean=False):
+        try:
+            start, end = parse_datetime(start_time), parse_datetime(end_time)
+        except ValueError as e:
+            return make_result(lean, Status.INVALID, "Invalid booking time: {0}", e)
+        if start >= end:
+            return make_result(lean, Status.INVALID, "Booking from {0} to {1} must end after it starts.",
+                               start_time, end_time)
+        if self.status == "UNAVAILABLE" or self._conflicts([(start, end, (start_time, end_time))]):
+            return make_result(lean, Status.UNAVAILABLE, "Asset {0} is not available from {1} to {2}.",
+                               self.asset_id, start_time, end_time)
 
+        booking = self._add_booking(user_id, start_time, end_time)
+        return make_result(lean, Status.OK, "Asset {0} booked by user {1} from {2} to {3}. Booking ID: {4}",
+                           self.asset_id, user_id, start_time, end_time, booking['booking_id'], value=booking)
+    
+    def _add_booking(self, user_id, start_time, end_time):
+        Assets._booking_counter += 1
         booking_record = {
+            'booking_id': f"BKG-{Assets._booking_counter:08d}",
+            'asset_id': self.asset_id,
             'user_id': user_id,
             'start_time': start_time,
             'end_time': end_time,
             'status': "ACTIVE"
         }
-        self.bookings.append(booking_record)  
-        return True, f"Asset {self.asset_id} booked by user {user_id} from {start_time} to {end_time}."
-    
+        import heapq
+
+        index = len(self.bookings)
+        self.booking_index[booking_record['booking_id']] = index
+        self.user_booking_index.setdefault(user_id, []).append(index)
+        self.bookings.append(booking_record)
+        heapq.heappush(self.active_booking_ends, (self._sort_key(end_time), index))
+        return booking_record
+
+    @staticmethod
+    def _sort_key(datetime_str):
+        return datetime_str[6:10] + datetime_str[3:5] + datetime_str[0:2] + datetime_str[10:]
+
+    def _has_current_bookings(self, now):
+        import heapq
+
+        now_key = self._sort_key(now)
+        ends = self.active_booking_ends
+        while ends and (ends[0][0] <= now_key or self.bookings[ends[0][1]]['status'] != "ACTIVE"):
+            heapq.heappop(ends)
+        return bool(ends)
+
+    def _find_booking(self, booking_id, status):
+        index = self.booking_index.get(booking_id)
+        if index is not None:
+            return index if self.bookings[index]['status'] == status else None
+        for index in self.user_booking_index.get(booking_id, ()):
+            if self.bookings[index]['status'] == status:
+                return index
+        return None
+
+    def _busy_spans(self):
+        import bisect
+
+        key = (len(self.bookings), len(self.booking_changes), len(self.maintenance_records))
+        if key == self.busy_key:
+            return self.busy_spans
+        spans = self.booking_spans
+        seen = len(spans)
+        spans.extend((parse_datetime(b['start_time']), parse_datetime(b['end_time'])) for b in self.bookings[seen:])
+        if key[1:] == self.busy_key[1:]:
+            for span in spans[seen:]:
+                bisect.insort(self.busy_spans, span)
+        else:
+            busy = [spans[i] for i, b in enumerate(self.bookings) if b['status'] in ["ACTIVE", "ONGOING"]]
+            busy.extend((parse_datetime(m['start_time']), parse_datetime(m['end_time'])) for m in self.maintenance_records)
+            busy.sort()
+            self.busy_spans = busy
+        self.busy_key = key
+        return self.busy_spans
+
+    def find_conflicts(self, windows):
+        if self.status == "UNAVAILABLE":
+            return list(windows)
+        return self._conflicts(sorted((parse_datetime(start), parse_datetime(end), (start, end)) for start, end in windows))
+
+    def _conflicts(self, requested):
+        busy = self._busy_spans()
+        conflicts = []
+        first = 0
+        previous_end = None
+        for start, end, window in requested:
+            if previous_end and start < previous_end:
+                conflicts.append(window)
+                continue
+            previous_end = end
+            while first < len(busy) and busy[first][1] <= start:
+                first += 1
+            if first < len(busy) and busy[first][0] < end:
+                conflicts.append(window)
+        return conflicts
+
     def check_in(self, booking_id):
-        for booking in self.bookings:  
-            if booking['user_id'] == booking_id and booking['status'] == "ACTIVE":
-                booking['status'] = "ONGOING"
-                return True, f"User {booking_id} checked in to asset {self.asset_id}."
-        return False, f"No active booking found for user {booking_id} on asset {self.asset_id}."
+        index = self._find_booking(booking_id, "ACTIVE")
+        if index is None:
+            return False, f"No active booking found for {booking_id} on asset {self.asset_id}."
+        booking = self.bookings[index]
+        booking['status'] = "ONGOING"
+        self.booking_changes.append(index)
+        return True, f"User {booking['user_id']} checked in to asset {self.asset_id}."
     
     def check_out(self, booking_id, condition="GOOD"):
-        for booking in self.bookings:  
-            if booking['user_id'] == booking_id and booking['status'] == "ONGOING":
-                booking['status'] = "COMPLETED"
-                booking['condition'] = condition
-                booking['return_time'] = self._get_current_datetime()
-
-                has_upcoming = False
-                current_time = self._get_current_datetime()
-
-                for b in self.bookings:
-                    if b['status'] == "ACTIVE" and b['start_time'] > current_time:
-                        has_upcoming = True
-                        break
-
-                self.status = "AVAILABLE" if not has_upcoming else "BOOKED"
-                return True, f"User {booking_id} checked out from asset {self.asset_id}."
-        return False, f"No ongoing booking found for user {booking_id} on asset {self.asset_id}."
+        index = self._find_booking(booking_id, "ONGOING")
+        if index is None:
+            return False, f"No ongoing booking found for {booking_id} on asset {self.asset_id}."
+        booking = self.bookings[index]
+        booking['status'] = "COMPLETED"
+        booking['condition'] = condition
+        booking['return_time'] = self._get_current_datetime()
+        self.booking_changes.append(index)
+
+        if self.status not in ["MAINTENANCE", "UNAVAILABLE"]:
+            self.status = "BOOKED" if self._has_current_bookings(booking['return_time']) else "AVAILABLE"
+        return True, f"User {booking['user_id']} checked out from asset {self.asset_id}."
     
     def _get_current_datetime(self):
         from datetime import datetime
@@ -465,7 +654,13 @@ class Assets:
             'description': description
         }
         self.maintenance_records.append(maintenance_record)
-        self.status = "MAINTENANCE"
+        try:
+            now = parse_datetime(self._get_current_datetime())
+            in_progress = parse_datetime(start_time) <= now < parse_datetime(end_time)
+        except ValueError:
+            in_progress = True
+        if in_progress and self.status != "UNAVAILABLE":
+            self.status = "MAINTENANCE"
         return True, f"Added maintenance record for asset {self.asset_id} from {start_time} to {end_time}."
     
     def update_asset_status(self, new_status):
@@ -487,7 +682,7 @@ class Assets:
                 file.write(f"Deposit Amount: {self.deposit_amount}\n")
                 file.write("Bookings:\n")
                 for booking in self.bookings: 
-                    file.write(f"  User ID: {booking['user_id']}, Start: {booking['start_time']}, End: {booking['end_time']}, Status: {booking['status']}\n")
+                    file.write(f"  Booking ID: {booking.get('booking_id')}, User ID: {booking['user_id']}, Start: {booking['start_time']}, End: {booking['end_time']}, Status: {booking['status']}\n")
                 file.write("Maintenance Records:\n")
                 for maintenance in self.maintenance_records:
                     file.write(f"  Start: {maintenance['start_time']}, End: {maintenance['end_time']}, Description: {maintenance['description']}\n")
@@ -495,26 +690,1108 @@ class Assets:
         except Exception as e:
             return f"Failed to store asset data for {self.asset_id} in {filename}. Error: {e}"
 
+class AssetStatusEngine:
+    def __init__(self, asset_records):
+        self.asset_records = asset_records
+        self.events = []
+        self.sequence = 0
+        self.clock = None
+        self.active_bookings = {}
+        self.active_maintenance = {}
+        self.started = set()
+        self.timestamps = {}
+
+    def _timestamp(self, value):
+        if not isinstance(value, str):
+            return value.timestamp()
+        timestamp = self.timestamps.get(value)
+        if timestamp is None:
+            timestamp = parse_datetime(value).timestamp()
+            self.timestamps[value] = timestamp
+        return timestamp
+
+    def _asset_events(self, asset):
+        for booking in asset.bookings:
+            if booking['status'] in ["ACTIVE", "ONGOING"]:
+                yield booking, 'booking'
+        for maintenance in asset.maintenance_records:
+            yield maintenance, 'maintenance'
+
+    def _push(self, asset_id, record, kind):
+        import heapq
+
+        start = self._timestamp(record['start_time'])
+        end = self._timestamp(record['end_time'])
+        if self.clock is not None and end <= self.clock:
+            return
+        self.sequence += 1
+        heapq.heappush(self.events, (start, self.sequence, "START", kind, asset_id, record))
+        self.sequence += 1
+        heapq.heappush(self.events, (end, self.sequence, "END", kind, asset_id, record))
+
+    def load(self, now=None):
+        import heapq
+
+        self.events = []
+        self.active_bookings = {}
+        self.active_maintenance = {}
+        self.started = set()
+        self.clock = None
+        for asset in self.asset_records.values():
+            for record, kind in self._asset_events(asset):
+                start = self._timestamp(record['start_time'])
+                end = self._timestamp(record['end_time'])
+                self.events.append((start, self.sequence, "START", kind, asset.asset_id, record))
+                self.events.append((end, self.sequence + 1, "END", kind, asset.asset_id, record))
+                self.sequence += 2
+        heapq.heapify(self.events)
+        return self.advance(now)
+
+    def track(self, asset_id, record, kind):
+        if self.clock is None:
+            return
+        self._push(asset_id, record, kind)
+
+    def _derive_status(self, asset):
+        if asset.status == "UNAVAILABLE":
+            return asset.status
+        if self.active_maintenance.get(asset.asset_id):
+            return "MAINTENANCE"
+        if self.active_bookings.get(asset.asset_id):
+            return "BOOKED"
+        return "AVAILABLE"
+
+    def advance(self, now=None):
+        import heapq
+        from datetime import datetime
+
+        if now is None:
+            now = datetime.now()
+        self.clock = self._timestamp(now)
+
+        transitions = []
+        while self.events and self.events[0][0] <= self.clock:
+            timestamp, sequence, edge, kind, asset_id, record = heapq.heappop(self.events)
+            asset = self.asset_records.get(asset_id)
+            if asset is None:
+                continue
+            counters = self.active_maintenance if kind == 'maintenance' else self.active_bookings
+            key = id(record)
+            if edge == "START":
+                if kind == 'booking' and record['status'] not in ["ACTIVE", "ONGOING"]:
+                    continue
+                self.started.add(key)
+                counters[asset_id] = counters.get(asset_id, 0) + 1
+            elif key in self.started:
+                self.started.discard(key)
+                counters[asset_id] -= 1
+            else:
+                continue
+
+            new_status = self._derive_status(asset)
+            if new_status != asset.status:
+                transitions.append((asset_id, asset.status, new_status))
+                asset.status = new_status
+        return transitions
+
+    def next_event_time(self):
+        from datetime import datetime
+
+        if not self.events:
+            return None
+        return datetime.fromtimestamp(self.events[0][0]).strftime("%d-%m-%Y %H:%M")
+
+    def recompute_status_at(self, at_time, apply=True):
+        import numpy as np
+
+        assets = list(self.asset_records.values())
+        asset_index = []
+        starts = []
+        ends = []
+        is_maintenance = []
+        for i, asset in enumerate(assets):
+            for record, kind in self._asset_events(asset):
+                asset_index.append(i)
+                starts.append(self._timestamp(record['start_time']))
+                ends.append(self._timestamp(record['end_time']))
+                is_maintenance.append(kind == 'maintenance')
+
+        at = self._timestamp(at_time)
+        asset_index = np.array(asset_index, dtype=np.int64)
+        active = (np.array(starts, dtype=np.float64) <= at) & (at < np.array(ends, dtype=np.float64))
+        is_maintenance = np.array(is_maintenance, dtype=bool)
+        maintenance_counts = np.bincount(asset_index[active & is_maintenance], minlength=len(assets))
+        booking_counts = np.bincount(asset_index[active & ~is_maintenance], minlength=len(assets))
+
+        statuses = {}
+        summary = {"AVAILABLE": 0, "BOOKED": 0, "MAINTENANCE": 0, "UNAVAILABLE": 0}
+        for i, asset in enumerate(assets):
+            if asset.status == "UNAVAILABLE":
+                status = "UNAVAILABLE"
+            elif maintenance_counts[i]:
+                status = "MAINTENANCE"
+            elif booking_counts[i]:
+                status = "BOOKED"
+            else:
+                status = "AVAILABLE"
+            statuses[asset.asset_id] = status
+            summary[status] += 1
+            if apply:
+                asset.status = status
+        return statuses, summary
+
+    def find_maintenance_clashes(self):
+        clashes = []
+        for asset in self.asset_records.values():
+            if not asset.maintenance_records or not asset.bookings:
+                continue
+            windows = sorted(
+                (self._timestamp(m['start_time']), self._timestamp(m['end_time']), m) for m in asset.maintenance_records
+            )
+            bookings = sorted(
+                (self._timestamp(b['start_time']), self._timestamp(b['end_time']), i, b)
+                for i, b in enumerate(asset.bookings) if b['status'] in ["ACTIVE", "ONGOING"]
+            )
+            first = 0
+            for booking_start, booking_end, i, booking in bookings:
+                while first < len(windows) and windows[first][1] <= booking_start:
+                    first += 1
+                j = first
+                while j < len(windows) and windows[j][0] < booking_end:
+                    if windows[j][1] > booking_start:
+                        maintenance = windows[j][2]
+                        clashes.append({
+                            "asset_id": asset.asset_id,
+                            "user_id": booking['user_id'],
+                            "booking_start": booking['start_time'],
+                            "booking_end": booking['end_time'],
+                            "maintenance_start": maintenance['start_time'],
+                            "maintenance_end": maintenance['end_time'],
+                            "description": maintenance['description']
+                        })
+                    j += 1
+        return clashes
+
+def parse_datetime_array(datetime_strs):
+    import numpy as np
+
+    joined = "".join(datetime_strs).encode("ascii")
+    if len(joined) == 16 * len(datetime_strs):
+        codes = np.frombuffer(joined, dtype=np.uint8).reshape(-1, 16).astype(np.int64) - 48
+    else:
+        codes = np.array(datetime_strs, dtype="U16").view(np.uint32).reshape(-1, 16).astype(np.int64) - 48
+    day = codes[:, 0] * 10 + codes[:, 1]
+    month = codes[:, 3] * 10 + codes[:, 4]
+    year = codes[:, 6] * 1000 + codes[:, 7] * 100 + codes[:, 8] * 10 + codes[:, 9]
+    minutes = (codes[:, 11] * 10 + codes[:, 12]) * 60 + codes[:, 14] * 10 + codes[:, 15]
+
+    year = year - (month <= 2)
+    era = year // 400
+    year_of_era = year - era * 400
+    day_of_year = (153 * (month + np.where(month > 2, -3, 9)) + 2) // 5 + day - 1
+    day_of_era = year_of_era * 365 + year_of_era // 4 - year_of_era // 100 + day_of_year
+    days = era * 146097 + day_of_era - 719468
+    return days * 1440 + minutes
+
+class AssetAnalytics:
+    def __init__(self, asset_records):
+        import numpy as np
+
+        self.asset_records = asset_records
+        self.assets = []
+        self.asset_positions = {}
+        self.ingested = {}
+        self.changes_seen = {}
+        self.rows = {}
+        self.codes = {"status": {}, "condition": {}}
+        self.asset_index = np.zeros(0, dtype=np.int64)
+        self.start = np.zeros(0, dtype=np.int64)
+        self.end = np.zeros(0, dtype=np.int64)
+        self.status = np.zeros(0, dtype=np.int64)
+        self.condition = np.zeros(0, dtype=np.int64)
+        self.columns = None
+
+    def _encode(self, kind, values):
+        import numpy as np
+
+        lookup = self.codes[kind]
+        for value in dict.fromkeys(values):
+            if value not in lookup:
+                lookup[value] = len(lookup)
+        return np.array([lookup[value] for value in values], dtype=np.int64)
+
+    def refresh(self):
+        import numpy as np
+
+        for asset_id, asset in self.asset_records.items():
+            if asset_id not in self.asset_positions:
+                self.asset_positions[asset_id] = len(self.assets)
+                self.assets.append(asset)
+                self.ingested[asset_id] = 0
+                self.changes_seen[asset_id] = 0
+                self.rows[asset_id] = []
+
+        new_positions = []
+        new_bookings = []
+        changed_rows = []
+        changed_bookings = []
+        row = len(self.asset_index)
+        for position, asset in enumerate(self.assets):
+            asset_id = asset.asset_id
+            seen = self.ingested[asset_id]
+            if len(asset.bookings) > seen:
+                added = asset.bookings[seen:]
+                new_bookings.extend(added)
+                new_positions.append((position, len(added)))
+                self.rows[asset_id].extend(range(row, row + len(added)))
+                row += len(added)
+                self.ingested[asset_id] = len(asset.bookings)
+
+            changes = asset.booking_changes
+            if len(changes) > self.changes_seen[asset_id]:
+                asset_rows = self.rows[asset_id]
+                for booking_index in changes[self.changes_seen[asset_id]:]:
+                    changed_rows.append(asset_rows[booking_index])
+                    changed_bookings.append(asset.bookings[booking_index])
+                self.changes_seen[asset_id] = len(changes)
+
+        if new_bookings:
+            positions = np.repeat(
+                np.array([position for position, count in new_positions], dtype=np.int64),
+                np.array([count for position, count in new_positions], dtype=np.int64)
+            )
+            self.asset_index = np.concatenate([self.asset_index, positions])
+            self.start = np.concatenate([self.start, parse_datetime_array([booking['start_time'] for booking in new_bookings])])
+            self.end = np.concatenate([self.end, parse_datetime_array([booking['end_time'] for booking in new_bookings])])
+            self.status = np.concatenate([self.status, self._encode("status", [booking['status'] for booking in new_bookings])])
+            self.condition = np.concatenate([self.condition, self._encode("condition", [booking.get('condition', "") for booking in new_bookings])])
+
+        if changed_rows:
+            changed_rows = np.array(changed_rows, dtype=np.int64)
+            self.status[changed_rows] = self._encode("status", [booking['status'] for booking in changed_bookings])
+            self.condition[changed_rows] = self._encode("condition", [booking.get('condition', "") for booking in changed_bookings])
+
+        type_lookup = {}
+        location_lookup = {}
+        asset_type = np.array([type_lookup.setdefault(str(asset.type), len(type_lookup)) for asset in self.assets], dtype=np.int64)
+        asset_location = np.array([location_lookup.setdefault(str(asset.location), len(location_lookup)) for asset in self.assets], dtype=np.int64)
+
+        self.columns = {
+            "asset_ids": [asset.asset_id for asset in self.assets],
+            "asset_index": self.asset_index,
+            "start": self.start,
+            "end": self.end,
+            "types": list(type_lookup),
+            "asset_type": asset_type,
+            "locations": list(location_lookup),
+            "asset_location": asset_location,
+            "status_names": list(self.codes["status"]),
+            "status": self.status,
+            "condition_names": list(self.codes["condition"]),
+            "condition": self.condition
+        }
+        return len(new_bookings) + len(changed_bookings)
+
+    def _ensure_columns(self):
+        if self.columns is None:
+            self.refresh()
+        return self.columns
+
+    def _status_mask(self, *names):
+        import numpy as np
+
+        columns = self._ensure_columns()
+        codes = [i for i, name in enumerate(columns["status_names"]) if name in names]
+        return np.isin(columns["status"], codes)
+
+    def utilization_by_hour_of_week(self):
+        import numpy as np
+
+        columns = self._ensure_columns()
+        used = self._status_mask("ACTIVE", "ONGOING", "COMPLETED")
+        if not used.any():
+            return np.zeros((7, 24))
+        start_hour = columns["start"][used] // 60
+        end_hour = -(-columns["end"][used] // 60)
+        first_hour = start_hour.min()
+        span = end_hour.max() - first_hour
+
+        occupancy = np.zeros(span + 1, dtype=np.int64)
+        np.add.at(occupancy, start_hour - first_hour, 1)
+        np.add.at(occupancy, end_hour - first_hour, -1)
+        occupancy = np.cumsum(occupancy)[:span]
+
+        hour_of_week = ((np.arange(span) + first_hour) // 24 + 3) % 7 * 24 + (np.arange(span) + first_hour) % 24
+        booked_hours = np.bincount(hour_of_week, weights=occupancy, minlength=168)
+        available_hours = np.bincount(hour_of_week, minlength=168) * len(columns["asset_ids"])
+        return (booked_hours / np.maximum(available_hours, 1)).reshape(7, 24)
+
+    def revenue_by_type_and_location(self, hourly_rates, default_rate=0.0):
+        import numpy as np
+
+        columns = self._ensure_columns()
+        billable = self._status_mask("ONGOING", "COMPLETED")
+        rates = np.array([hourly_rates.get(asset_type, default_rate) for asset_type in columns["types"]], dtype=np.float64)
+        booking_type = columns["asset_type"][columns["asset_index"]]
+        booking_location = columns["asset_location"][columns["asset_index"]]
+        revenue = (columns["end"] - columns["start"]) / 60.0 * rates[booking_type] * billable
+
+        by_type = np.bincount(booking_type, weights=revenue, minlength=len(columns["types"]))
+        by_location = np.bincount(booking_location, weights=revenue, minlength=len(columns["locations"]))
+        return (
+            {str(name): float(total) for name, total in zip(columns["types"], by_type)},
+            {str(name): float(total) for name, total in zip(columns["locations"], by_location)}
+        )
+
+    def no_show_rates(self, now=None):
+        import numpy as np
+        from datetime import datetime
+
+        columns = self._ensure_columns()
+        if now is None:
+            now = datetime.now().strftime("%d-%m-%Y %H:%M")
+        past = columns["end"] < parse_datetime_array([now])[0]
+        no_show = past & self._status_mask("ACTIVE")
+        booking_type = columns["asset_type"][columns["asset_index"]]
+        past_by_type = np.bincount(booking_type[past], minlength=len(columns["types"]))
+        no_show_by_type = np.bincount(booking_type[no_show], minlength=len(columns["types"]))
+
+        overall = float(no_show.sum() / past.sum()) if past.any() else 0.0
+        by_type = {str(name): float(misses / total) for name, misses, total in zip(columns["types"], no_show_by_type, past_by_type) if total}
+        return overall, by_type
+
+    def damage_rates(self):
+        import numpy as np
+
+        columns = self._ensure_columns()
+        completed = self._status_mask("COMPLETED")
+        total = completed.sum()
+        if not total:
+            return {}, {}
+        counts = np.bincount(columns["condition"][completed], minlength=len(columns["condition_names"]))
+        by_condition = {str(name): float(count / total) for name, count in zip(columns["condition_names"], counts) if count}
+
+        good = [i for i, name in enumerate(columns["condition_names"]) if name in ["GOOD", ""]]
+        damaged = completed & ~np.isin(columns["condition"], good)
+        booking_type = columns["asset_type"][columns["asset_index"]]
+        completed_by_type = np.bincount(booking_type[completed], minlength=len(columns["types"]))
+        damaged_by_type = np.bincount(booking_type[damaged], minlength=len(columns["types"]))
+        by_type = {str(name): float(bad / done) for name, bad, done in zip(columns["types"], damaged_by_type, completed_by_type) if done}
+        return by_condition, by_type
+
+    def generate_report(self, hourly_rates=None, now=None):
+        self.refresh()
+        revenue_by_type, revenue_by_location = self.revenue_by_type_and_location(hourly_rates or {})
+        no_show_rate, no_show_by_type = self.no_show_rates(now)
+        damage_by_condition, damage_by_type = self.damage_rates()
+        return {
+            "bookings": len(self.columns["asset_index"]),
+            "utilization_by_hour_of_week": self.utilization_by_hour_of_week().round(4).tolist(),
+            "revenue_by_type": revenue_by_type,
+            "revenue_by_location": revenue_by_location,
+            "no_show_rate": no_show_rate,
+            "no_show_rate_by_type": no_show_by_type,
+            "damage_rate_by_condition": damage_by_condition,
+            "damage_rate_by_type": damage_by_type
+        }
+
+GRADE_LETTERS = ["A", "B", "C", "D", "F"]
+
+class AcademicAnalytics:
+    def __init__(self, enrollment_records, student_records, course_catalog, change_log):
+        self.enrollment_records = enrollment_records
+        self.student_records = student_records
+        self.course_catalog = course_catalog
+        self.change_log = change_log
+        self.reset()
+
+    def reset(self):
+        import numpy as np
+
+        self.changes_seen = len(self.change_log)
+        self.rows = {}
+        self.student_positions = {}
+        self.course_positions = {}
+        self.student_ids = []
+        self.course_codes = []
+        self.grade_codes = {grade: i for i, grade in enumerate(GRADE_LETTERS)}
+        self.student = np.zeros(0, dtype=np.int64)
+        self.course = np.zeros(0, dtype=np.int64)
+        self.grade = np.zeros(0, dtype=np.int64)
+        self.attendance = np.zeros(0, dtype=np.float64)
+        self.active = np.zeros(0, dtype=bool)
+        self.gpa = np.zeros(0, dtype=np.float64)
+        self.lecturers = []
+        self.course_lecturer = np.zeros(0, dtype=np.int64)
+
+    def _position(self, positions, keys, key):
+        position = positions.get(key)
+        if position is None:
+            position = positions[key] = len(keys)
+            keys.append(key)
+        return position
+
+    def _grade_code(self, grade):
+        return self.grade_codes.get(grade, len(GRADE_LETTERS))
+
+    def refresh(self):
+        import numpy as np
+
+        changed = self.change_log[self.changes_seen:]
+        self.changes_seen = len(self.change_log)
+        new_enrollments = {}
+        for enrollment in changed:
+            if enrollment.enrollment_id not in self.rows:
+                new_enrollments[enrollment.enrollment_id] = enrollment
+        if len(self.rows) + len(new_enrollments) < len(self.enrollment_records):
+            for enrollment in self.enrollment_records.values():
+                if enrollment.enrollment_id not in self.rows:
+                    new_enrollments.setdefault(enrollment.enrollment_id, enrollment)
+        new_enrollments = list(new_enrollments.values())
+        if new_enrollments:
+            row = len(self.rows)
+            for enrollment in new_enrollments:
+                self.rows[enrollment.enrollment_id] = row
+                row += 1
+            self.student = np.concatenate([self.student, np.array(
+                [self._position(self.student_positions, self.student_ids, e.student_id) for e in new_enrollments], dtype=np.int64)])
+            self.course = np.concatenate([self.course, np.array(
+                [self._position(self.course_positions, self.course_codes, e.course_code) for e in new_enrollments], dtype=np.int64)])
+            self.grade = np.concatenate([self.grade, np.array([self._grade_code(e.grade) for e in new_enrollments], dtype=np.int64)])
+            self.attendance = np.concatenate([self.attendance, np.array([e.attendance_record for e in new_enrollments], dtype=np.float64)])
+            self.active = np.concatenate([self.active, np.array([e.status == "ACTIVE" for e in new_enrollments], dtype=bool)])
+
+        if changed:
+            changed_rows = np.array([self.rows[e.enrollment_id] for e in changed], dtype=np.int64)
+            self.grade[changed_rows] = [self._grade_code(e.grade) for e in changed]
+            self.attendance[changed_rows] = [e.attendance_record for e in changed]
+            self.active[changed_rows] = [e.status == "ACTIVE" for e in changed]
+
+        for student_id in self.student_records:
+            self._position(self.student_positions, self.student_ids, student_id)
+        self.gpa = np.array([
+            self.student_records[student_id].gpa if student_id in self.student_records else 0.0
+            for student_id in self.student_ids
+        ], dtype=np.float64)
+
+        lecturer_positions = {}
+        self.lecturers = []
+        self.course_lecturer = np.array([
+            self._position(lecturer_positions, self.lecturers,
+                           self.course_catalog[code].lecturer if code in self.course_catalog else "")
+            for code in self.course_codes
+        ], dtype=np.int64)
+        return len(new_enrollments) + len(changed)
+
+    def _grade_table(self, groups, group_count):
+        import numpy as np
+
+        counts = np.bincount(groups * (len(GRADE_LETTERS) + 1) + self.grade, minlength=group_count * (len(GRADE_LETTERS) + 1))
+        return counts.reshape(group_count, len(GRADE_LETTERS) + 1)[:, :len(GRADE_LETTERS)]
+
+    def grade_distribution_by_course(self):
+        table = self._grade_table(self.course, len(self.course_codes))
+        return {code: dict(zip(GRADE_LETTERS, row.tolist())) for code, row in zip(self.course_codes, table) if row.any()}
+
+    def grade_distribution_by_lecturer(self):
+        table = self._grade_table(self.course_lecturer[self.course], len(self.lecturers))
+        return {lecturer: dict(zip(GRADE_LETTERS, row.tolist())) for lecturer, row in zip(self.lecturers, table) if row.any()}
+
+    def pass_rates(self, by="course"):
+        if by == "lecturer":
+            table, names = self._grade_table(self.course_lecturer[self.course], len(self.lecturers)), self.lecturers
+        else:
+            table, names = self._grade_table(self.course, len(self.course_codes)), self.course_codes
+        graded = table.sum(axis=1)
+        passed = table[:, :4].sum(axis=1)
+        return {name: float(p / g) for name, p, g in zip(names, passed, graded) if g}
+
+    def low_attendance(self, threshold=75.0):
+        import numpy as np
+
+        rows = np.nonzero(self.active & (self.attendance < threshold))[0]
+        return [(self.student_ids[self.student[row]], self.course_codes[self.course[row]], float(self.attendance[row]))
+                for row in rows]
+
+    def low_gpa_students(self, threshold=2.0):
+        import numpy as np
+
+        graded = np.bincount(self.student[self.grade < len(GRADE_LETTERS)], minlength=len(self.student_ids))
+        rows = np.nonzero((graded > 0) & (self.gpa < threshold))[0]
+        return [(self.student_ids[row], float(self.gpa[row])) for row in rows]
+
+    def at_risk_students(self, gpa_threshold=2.0, attendance_threshold=75.0):
+        at_risk = {}
+        for student_id, gpa in self.low_gpa_students(gpa_threshold):
+            at_risk.setdefault(student_id, []).append(f"GPA {gpa:.2f}")
+        for student_id, course_code, attendance in self.low_attendance(attendance_threshold):
+            at_risk.setdefault(student_id, []).append(f"Attendance {attendance:.1f}% in {course_code}")
+        return at_risk
+
+    def generate_report(self, gpa_threshold=2.0, attendance_threshold=75.0):
+        self.refresh()
+        return {
+            "enrollments": len(self.rows),
+            "grade_distribution_by_course": self.grade_distribution_by_course(),
+            "grade_distribution_by_lecturer": self.grade_distribution_by_lecturer(),
+            "pass_rate_by_course": self.pass_rates("course"),
+            "pass_rate_by_lecturer": self.pass_rates("lecturer"),
+            "at_risk_students": self.at_risk_students(gpa_threshold, attendance_threshold)
+        }
+
+class CourseAttendance:
+    def __init__(self, course_code, slots, weeks, term_start):
+        import numpy as np
+
+        self.course_code = course_code
+        self.slots = slots
+        self.weeks = weeks
+        self.session_count = len(slots) * weeks
+        self.byte_width = max(1, (self.session_count + 7) // 8)
+        self.rows = {}
+        self.student_ids = []
+        self.bits = np.zeros((16, self.byte_width), dtype=np.uint8)
+        self.session_starts = np.array([
+            term_start + (week * 7 + offset) * 1440 + start
+            for week in range(weeks) for offset, start, end, venue in slots
+        ], dtype=np.int64)
+
+    def row(self, student_id):
+        import numpy as np
+
+        row = self.rows.get(student_id)
+        if row is None:
+            row = self.rows[student_id] = len(self.student_ids)
+            self.student_ids.append(student_id)
+            if row >= len(self.bits):
+                self.bits = np.concatenate([self.bits, np.zeros_like(self.bits)])
+        return row
+
+    def mark(self, rows, sessions):
+        import numpy as np
+
+        rows = np.asarray(rows, dtype=np.int64)
+        sessions = np.asarray(sessions, dtype=np.int64)
+        np.bitwise_or.at(self.bits, (rows, sessions >> 3), (128 >> (sessions & 7)).astype(np.uint8))
+
+    def held_mask(self, as_of):
+        import numpy as np
+
+        return np.packbits(self.session_starts < as_of, bitorder="big")[:self.byte_width] if self.session_count else \
+            np.zeros(self.byte_width, dtype=np.uint8)
+
+    def percentages(self, as_of):
+        import numpy as np
+
+        mask = self.held_mask(as_of)
+        held = int(np.unpackbits(mask).sum())
+        count = len(self.student_ids)
+        if not held:
+            return np.full(count, 100.0), 0
+        present = np.unpackbits(self.bits[:count] & mask, axis=1).sum(axis=1)
+        return present * 100.0 / held, held
+
+class AttendanceService:
+    def __init__(self, course_catalog, enrollment_records, semester_courses, change_log=None):
+        self.course_catalog = course_catalog
+        self.enrollment_records = enrollment_records
+        self.semester_courses = semester_courses
+        self.change_log = change_log if change_log is not None else []
+        self.terms = {}
+        self.registers = {}
+        self.clocks = {}
+        self.rosters = {}
+        self.changes_seen = 0
+
+    def set_term(self, semester, term_start, weeks=14):
+        from datetime import datetime
+
+        try:
+            first_day = datetime.strptime(term_start, "%d-%m-%Y")
+        except ValueError:
+            return False, f"Invalid term start date {term_start}."
+        start = int(parse_datetime_array([f"{term_start} 00:00"])[0])
+        self.terms[semester] = (start, weeks, first_day.weekday())
+        return True, f"Term {semester} starts {term_start} and runs {weeks} weeks."
+
+    def _register(self, semester, course_code):
+        register = self.registers.get((semester, course_code))
+        if register is None:
+            course = self.course_catalog.get(course_code)
+            if course is None or semester not in self.terms:
+                return None
+            start, weeks, first_weekday = self.terms[semester]
+            slots = []
+            for day, start_time, end_time, venue in course.schedule:
+                weekday = DAY_ORDER.get(day[:3].lower())
+                if weekday is not None:
+                    slots.append(((weekday - first_weekday) % 7, time_to_minutes(start_time), time_to_minutes(end_time), venue))
+            slots.sort()
+            register = self.registers[(semester, course_code)] = CourseAttendance(course_code, slots, weeks, start)
+        return register
+
+    def _sync_rosters(self):
+        changes = self.change_log
+        for enrollment in changes[self.changes_seen:]:
+            self.rosters.setdefault((enrollment.semester, enrollment.course_code), {})[enrollment.student_id] = enrollment
+        self.changes_seen = len(changes)
+
+    def _sync_register(self, semester, course_code):
+        """The course register plus (row, enrollment) for every enrollee who has not withdrawn"""
+        register = self._register(semester, course_code)
+        if register is None:
+            return None, None
+        self._sync_rosters()
+        enrollments = []
+        for student_id, enrollment in self.rosters.get((semester, course_code), {}).items():
+            if enrollment.status != "WITHDRAWN":
+                enrollments.append((register.row(student_id), enrollment))
+        return register, enrollments
+
+    def ingest_swipes(self, student_ids, timestamps, semester, grace_minutes=10, venues=None):
+        """Match card swipes (dd-mm-yyyy HH:MM) to scheduled sessions and set the presence bits"""
+        import numpy as np
+
+        if semester not in self.terms:
+            return None, f"No term dates set for {semester}."
+        start, weeks, first_weekday = self.terms[semester]
+        minutes = parse_datetime_array(timestamps) - start
+        week, offset = np.divmod(minutes // 1440, 7)
+        minute_of_day = minutes % 1440
+        if venues is None:
+            venues = [""] * len(student_ids)
+
+        # (register, row) pairs per distinct student, then the slots of each register, as flat arrays
+        student_positions = {}
+        swipe_student = np.fromiter((student_positions.setdefault(student_id, len(student_positions))
+                                     for student_id in student_ids), dtype=np.int64, count=len(student_ids))
+        registers = []
+        register_positions = {}
+        pair_offsets = [0]
+        pair_registers = []
+        pair_rows = []
+        for student_id in student_positions:
+            for course_code in self.semester_courses.get((student_id, semester), ()):
+                register = self._register(semester, course_code)
+                if register is None or not register.slots:
+                    continue
+                position = register_positions.get(course_code)
+                if position is None:
+                    position = register_positions[course_code] = len(registers)
+                    registers.append(register)
+                pair_registers.append(position)
+                pair_rows.append(register.row(student_id))
+            pair_offsets.append(len(pair_registers))
+
+        slot_counts = np.array([len(register.slots) for register in registers], dtype=np.int64)
+        slot_offsets = np.zeros(len(registers) + 1, dtype=np.int64)
+        np.cumsum(slot_counts, out=slot_offsets[1:])
+        slots = [slot for register in registers for slot in register.slots]
+        slot_days = np.array([slot[0] for slot in slots], dtype=np.int64)
+        slot_starts = np.array([slot[1] for slot in slots], dtype=np.int64)
+        slot_ends = np.array([slot[2] for slot in slots], dtype=np.int64)
+        venue_positions = {}
+        swipe_venues = np.fromiter((venue_positions.setdefault(venue, len(venue_positions)) for venue in venues),
+                                   dtype=np.int64, count=len(venues))
+        slot_venues = np.array([venue_positions.get(slot[3], -1) for slot in slots], dtype=np.int64)
+
+        def expand(offsets, owners):
+            counts = offsets[owners + 1] - offsets[owners]
+            total = int(counts.sum())
+            within = np.arange(total) - np.repeat(np.cumsum(counts) - counts, counts)
+            return np.repeat(np.arange(len(owners)), counts), np.repeat(offsets[owners], counts) + within
+
+        pair_offsets = np.array(pair_offsets, dtype=np.int64)
+        pair_registers = np.array(pair_registers, dtype=np.int64)
+        pair_rows = np.array(pair_rows, dtype=np.int64)
+        register_days = np.zeros(len(registers), dtype=np.int64)
+        np.bitwise_or.at(register_days, np.repeat(np.arange(len(registers)), slot_counts), 1 << slot_days)
+        valid = np.flatnonzero((week >= 0) & (week < weeks))
+        swipe_of_pair, pairs = expand(pair_offsets, swipe_student[valid])
+        swipe_of_pair = valid[swipe_of_pair]
+        on_day = (register_days[pair_registers[pairs]] >> offset[swipe_of_pair]) & 1 == 1
+        swipe_of_pair, pairs = swipe_of_pair[on_day], pairs[on_day]
+        pair_of_slot, candidate_slots = expand(slot_offsets, pair_registers[pairs])
+        candidate_swipes = swipe_of_pair[pair_of_slot]
+        candidate_pairs = pairs[pair_of_slot]
+
+        minute = minute_of_day[candidate_swipes]
+        hit = ((slot_days[candidate_slots] == offset[candidate_swipes]) &
+               (slot_starts[candidate_slots] - grace_minutes <= minute) & (minute < slot_ends[candidate_slots]))
+        candidate_swipes = candidate_swipes[hit]
+        candidate_pairs = candidate_pairs[hit]
+        candidate_slots = candidate_slots[hit]
+
+        # one session per swipe: the first slot at the swipe's venue, otherwise the first slot that fits
+        elsewhere = slot_venues[candidate_slots] != swipe_venues[candidate_swipes]
+        order = np.lexsort((np.arange(len(candidate_swipes)), elsewhere, candidate_swipes))
+        matched_swipes, first = np.unique(candidate_swipes[order], return_index=True)
+        chosen = order[first]
+        swipes = candidate_swipes[chosen]
+        chosen_registers = pair_registers[candidate_pairs[chosen]]
+        local_slots = candidate_slots[chosen] - slot_offsets[chosen_registers]
+        sessions = week[swipes] * slot_counts[chosen_registers] + local_slots
+        rows = pair_rows[candidate_pairs[chosen]]
+
+        by_register = np.argsort(chosen_registers, kind="stable")
+        marked, bounds = np.unique(chosen_registers[by_register], return_index=True)
+        for position, selected in zip(marked.tolist(), np.split(by_register, bounds[1:])):
+            registers[position].mark(rows[selected], sessions[selected])
+        if len(swipes):
+            ends = start + (week[swipes] * 7 + slot_days[candidate_slots[chosen]]) * 1440 + slot_ends[candidate_slots[chosen]]
+            self.clocks[semester] = max(self.clocks.get(semester, start), int(ends.max()))
+        matched = len(matched_swipes)
+        summary = {"swipes": len(student_ids), "matched": matched, "unmatched": len(student_ids) - matched,
+                   "courses": len(marked)}
+        return summary, f"{matched} of {len(student_ids)} swipes matched to sessions in {semester}."
+
+    def ingest_card_log(self, filename, semester, grace_minutes=10):
+        student_ids = []
+        timestamps = []
+        venues = []
+        try:
+            with open(filename, "r", buffering=1 << 20) as file:
+                for line in file:
+                    fields = line.rstrip("\n").split(",")
+                    if len(fields) >= 2 and len(fields[1]) == 16 and fields[0] != "student_id":
+                        student_ids.append(fields[0])
+                        timestamps.append(fields[1])
+                        venues.append(fields[2] if len(fields) > 2 else "")
+        except Exception as e:
+            return None, f"Error reading card reader log: {e}"
+        if not student_ids:
+            return None, f"No swipes found in {filename}."
+        return self.ingest_swipes(student_ids, timestamps, semester, grace_minutes, venues)
+
+    def _as_of(self, semester, as_of):
+        if as_of is None:
+            return self.clocks.get(semester, 0)
+        return int(parse_datetime_array([as_of])[0])
+
+    def course_attendance(self, course_code, semester, as_of=None):
+        register, enrollments = self._sync_register(semester, course_code)
+        if register is None:
+            return None, f"No attendance register for {course_code} in {semester}."
+        percentages, held = register.percentages(self._as_of(semester, as_of))
+        return ({enrollment.student_id: percentages[row].item() for row, enrollment in enrollments},
+                f"{held} sessions held for {course_code}.")
+
+    def update_attendance_records(self, semester, as_of=None):
+        as_of = self._as_of(semester, as_of)
+        self._sync_rosters()
+        changed = []
+        for term, course_code in list(self.rosters):
+            if term != semester:
+                continue
+            register, enrollments = self._sync_register(semester, course_code)
+            if register is None:
+                continue
+            percentages = register.percentages(as_of)[0].round(2)
+            for row, enrollment in enrollments:
+                percentage = percentages[row].item()
+                if enrollment.attendance_record != percentage:
+                    enrollment.attendance_record = percentage
+                    changed.append(enrollment)
+        self.change_log.extend(changed)
+        return True, f"Attendance updated for {len(changed)} enrollments in {semester}."
+
+    def memory_usage(self):
+        return sum(register.bits[:len(register.student_ids)].nbytes for register in self.registers.values())
+
+class TimetableSolver:
+    def __init__(self, course_catalog, asset_records, student_records):
+        self.course_catalog = course_catalog
+        self.asset_records = asset_records
+        self.student_records = student_records
+        self.days = ["Mon", "Tue", "Wed", "Thu", "Fri"]
+        self.day_start = 8 * 60
+        self.day_end = 18 * 60
+        self.period_minutes = 60
+        self.max_session_minutes = 180
+        self.room_types = ["ROOM", "CLASSROOM", "LECTURE_HALL", "LAB"]
+
+    def _periods_per_day(self):
+        return (self.day_end - self.day_start) // self.period_minutes
+
+    def _session_periods(self, course):
+        minutes = min(max(course.credits, 1) * 60, self.max_session_minutes)
+        return max(1, minutes // self.period_minutes)
+
+    def _start_mask(self, length):
+        per_day = self._periods_per_day()
+        day_mask = (1 << (per_day - length + 1)) - 1 if length <= per_day else 0
+        mask = 0
+        for d in range(len(self.days)):
+            mask |= day_mask << (d * per_day)
+        return mask
+
+    def _blocked_starts(self, occupied, length):
+        blocked = occupied
+        for offset in range(1, length):
+            blocked |= occupied >> offset
+        return blocked
+
+    def _window_mask(self, windows, outward=False):
+        """Bitmask of the periods in windows: whole periods inside each window, or every period it touches if outward"""
+        per_day = self._periods_per_day()
+        mask = 0
+        for day, start_time, end_time in windows:
+            day_index = DAY_ORDER.get(str(day)[:3].lower())
+            if day_index is None or day_index >= len(self.days):
+                continue
+            start_h, start_m = map(int, start_time.split(":"))
+            end_h, end_m = map(int, end_time.split(":"))
+            round_up = 0 if outward else self.period_minutes - 1
+            first = max(0, (start_h * 60 + start_m - self.day_start + round_up) // self.period_minutes)
+            last = min(per_day, (end_h * 60 + end_m - self.day_start + self.period_minutes - 1 - round_up) // self.period_minutes)
+            if last > first:
+                mask |= ((1 << (last - first)) - 1) << (day_index * per_day + first)
+        return mask
+
+    def _format_time(self, period):
+        minutes = self.day_start + period * self.period_minutes
+        return f"{minutes // 60:02d}:{minutes % 60:02d}"
+
+    def solve(self, course_codes=None, lecturer_availability=None):
+        if course_codes is None:
+            course_codes = list(self.course_catalog)
+        lecturer_availability = lecturer_availability or {}
+
+        venues = sorted(
+            (asset for asset in self.asset_records.values()
+             if str(asset.type).upper() in self.room_types and asset.status not in ["MAINTENANCE", "UNAVAILABLE"]),
+            key=lambda asset: asset.capacity
+        )
+        if not venues:
+            return None, "No rooms available for timetabling."
+
+        fixed_masks = {
+            code: self._window_mask([(day, start_time, end_time) for day, start_time, end_time, venue in course.schedule],
+                                    outward=True)
+            for code, course in self.course_catalog.items() if course.schedule
+        }
+        neighbours = {code: set() for code in course_codes}
+        course_blocked = {code: 0 for code in course_codes}
+        for student in self.student_records.values():
+            codes = [code for code in student.enrolled_courses if code in neighbours]
+            fixed = 0
+            for code in student.enrolled_courses:
+                if code not in neighbours:
+                    fixed |= fixed_masks.get(code, 0)
+            for code in codes:
+                neighbours[code].update(codes)
+                course_blocked[code] |= fixed
+        for code in neighbours:
+            neighbours[code].discard(code)
+
+        order = sorted(
+            course_codes,
+            key=lambda code: (-len(neighbours[code]), -self._session_periods(self.course_catalog[code]),
+                              -self.course_catalog[code].max_capacity)
+        )
+
+        per_day = self._periods_per_day()
+        start_masks = {}
+        venue_busy = {venue.asset_id: 0 for venue in venues}
+        lecturer_busy = {}
+        lecturer_allowed = {lecturer: self._window_mask(windows) for lecturer, windows in lecturer_availability.items()}
+
+        for code, course in self.course_catalog.items():
+            if code in course_blocked:
+                continue
+            for day, start_time, end_time, venue in course.schedule:
+                block = self._window_mask([(day, start_time, end_time)], outward=True)
+                if venue in venue_busy:
+                    venue_busy[venue] |= block
+                if course.lecturer:
+                    lecturer_busy[course.lecturer] = lecturer_busy.get(course.lecturer, 0) | block
+
+        timetable = {}
+        unscheduled = []
+        for code in order:
+            course = self.course_catalog[code]
+            length = self._session_periods(course)
+            if length not in start_masks:
+                start_masks[length] = self._start_mask(length)
+
+            occupied = course_blocked[code] | lecturer_busy.get(course.lecturer, 0)
+            if course.lecturer in lecturer_allowed:
+                occupied |= ~lecturer_allowed[course.lecturer] & ((1 << (per_day * len(self.days))) - 1)
+            candidates = start_masks[length] & ~self._blocked_starts(occupied, length)
+
+            chosen = None
+            for venue in venues:
+                if venue.capacity < course.max_capacity:
+                    continue
+                feasible = candidates & ~self._blocked_starts(venue_busy[venue.asset_id], length)
+                if feasible:
+                    chosen = venue, (feasible & -feasible).bit_length() - 1
+                    break
+
+            if chosen is None:
+                unscheduled.append(code)
+                continue
+
+            venue, start = chosen
+            block = ((1 << length) - 1) << start
+            venue_busy[venue.asset_id] |= block
+            if course.lecturer:
+                lecturer_busy[course.lecturer] = lecturer_busy.get(course.lecturer, 0) | block
+            for other in neighbours[code]:
+                course_blocked[other] |= block
+
+            day, period = divmod(start, per_day)
+            timetable[code] = (self.days[day], self._format_time(period), self._format_time(period + length), venue.asset_id)
+
+        return (timetable, unscheduled), f"Scheduled {len(timetable)} of {len(course_codes)} courses."
+
+    def apply(self, timetable):
+        for code, (day, start_time, end_time, venue) in timetable.items():
+            course = self.course_catalog[code]
+            course.schedule = []
+            course.schedule_version += 1
+            success, message = course.add_schedule(day, start_time, end_time, venue)
+            if not success:
+                return False, f"Could not schedule {code}: {message}"
+        return True, f"Applied timetable for {len(timetable)} courses."
+
+PASSING_GRADES = ("A", "B", "C", "D")
+
+class PrerequisiteGraph:
+    def __init__(self, course_catalog):
+        self.course_catalog = course_catalog
+        self.positions = {}
+        self.course_codes = []
+        self.closure = {}
+        self.completed = {}
+        self.program_requirements = {}
+
+    def _bit(self, course_code):
+        position = self.positions.get(course_code)
+        if position is None:
+            position = self.positions[course_code] = len(self.course_codes)
+            self.course_codes.append(course_code)
+        return 1 << position
+
+    def _codes(self, mask):
+        codes = []
+        while mask:
+            low = mask & -mask
+            codes.append(self.course_codes[low.bit_length() - 1])
+            mask ^= low
+        return codes
+
+    def add_prerequisite(self, course_code, prerequisite_code):
+        course = self.course_catalog.get(course_code)
+        if not course:
+            return False, f"Course {course_code} not found."
+        if prerequisite_code not in self.course_catalog:
+            return False, f"Course {prerequisite_code} not found."
+        if prerequisite_code in course.prerequisites:
+            return False, f"{prerequisite_code} is already a prerequisite of {course_code}."
+
+        course_bit = self._bit(course_code)
+        gained = self._bit(prerequisite_code) | self.closure.get(prerequisite_code, 0)
+        if gained & course_bit:
+            return False, f"Prerequisite {prerequisite_code} for {course_code} would create a cycle."
+
+        course.prerequisites.append(prerequisite_code)
+        course.version += 1
+        for code, closure in self.closure.items():
+            if closure & course_bit:
+                self.closure[code] = closure | gained
+        self.closure[course_code] = self.closure.get(course_code, 0) | gained
+        return True, f"{prerequisite_code} added as a prerequisite of {course_code}."
+
+    def get_prerequisites(self, course_code):
+        return self._codes(self.closure.get(course_code, 0))
+
+    def completed_mask(self, student):
+        version, mask = self.completed.get(student.student_id, (None, 0))
+        if version != student.grade_version:
+            mask = 0
+            for course_code, grade in student.completed_courses:
+                if grade in PASSING_GRADES:
+                    mask |= self._bit(course_code)
+            self.completed[student.student_id] = (student.grade_version, mask)
+        return mask
+
+    def missing_prerequisites(self, student, course_code):
+        required = self.closure.get(course_code, 0)
+        if not required:
+            return []
+        return self._codes(required & ~self.completed_mask(student))
+
+    def is_eligible(self, student, course_code):
+        required = self.closure.get(course_code, 0)
+        return not required or not required & ~self.completed_mask(student)
+
+    def set_program_requirements(self, program, course_codes):
+        missing = [code for code in course_codes if code not in self.course_catalog]
+        if missing:
+            return False, f"Courses not found: {', '.join(missing)}"
+        required = 0
+        for code in course_codes:
+            required |= self._bit(code)
+        self.program_requirements[program] = required
+        return True, f"{len(course_codes)} required courses set for {program}."
+
+    def degree_audit(self, student_records, program):
+        required = self.program_requirements.get(program)
+        if required is None:
+            return None, f"No requirements defined for program {program}."
+
+        required_codes = self._codes(required)
+        required_closures = [(code, self._bit(code), self.closure.get(code, 0)) for code in required_codes]
+        audit = {}
+        for student in student_records.values():
+            if student.program != program:
+                continue
+            mask = self.completed_mask(student)
+            outstanding = required & ~mask
+            audit[student.student_id] = {
+                "completed": (required & mask).bit_count(),
+                "required": len(required_codes),
+                "outstanding": self._codes(outstanding),
+                "eligible_now": [code for code, bit, closure in required_closures
+                                 if outstanding & bit and not closure & ~mask],
+                "complete": not outstanding
+            }
+        return audit, f"Degree audit completed for {len(audit)} students in {program}."
+
 class EnrollmentServices:
-    def __init__(self, course_catalog, student_records):
+    def __init__(self, course_catalog, student_records, change_log=None, prerequisite_graph=None):
         self.course_catalog = course_catalog
         self.student_records = student_records
+        self.change_log = change_log if change_log is not None else []
+        self.prerequisite_graph = prerequisite_graph
+        self.semester_courses = {}
+        self.course_slots = {}
+        self.student_schedules = {}
 
-    def enroll_student(self, student_id, course_code, semester):
+    def enroll_student(self, student_id, course_code, semester, lean=False):
         if student_id not in self.student_records:
-            return None, f"Student {student_id} not found."
-        if course_code not in self.course_catalog:
-            return None, f"Course {course_code} not found."
-        
-        student = self.student_records[student_id]
-        course = self.course_catalog[course_code]
-
-        success, message = student.enroll_in_course(course)  
-        if success:
-            enrollment = Enrollment(student_id, course_code, semester)
-            return enrollment, f"Student {student_id} enrolled in course {course_code} for semester {semester}."
+            result = Result(Status.NOT_FOUND, "Student {0} not found.", (student_id,))
+        elif course_code not in self.course_catalog:
+            result = Result(Status.NOT_FOUND, "Course {0} not found.", (course_code,))
         else:
-            return None, message
+            student = self.student_records[student_id]
+            course = self.course_catalog[course_code]
+
+            if self.prerequisite_graph and not self.prerequisite_graph.is_eligible(student, course_code):
+                result = Result(Status.PREREQUISITE, "Student {0} is missing prerequisites for {1}: {2}",
+                                (student_id, course_code, ", ".join(self.prerequisite_graph.missing_prerequisites(student, course_code))))
+            else:
+                result = student.enroll_in_course(course, lean=True)
+            if result:
+                enrollment = Enrollment(student_id, course_code, semester)
+                self.semester_courses.setdefault((student_id, semester), []).append(course_code)
+                result = Result(Status.OK, "Student {0} enrolled in course {1} for semester {2}.",
+                                (student_id, course_code, semester), enrollment)
+
+        if lean:
+            return result
+        return result.value, result.message
     
     def withdraw_enrollment(self, enrollment):
         success, message = enrollment.withdraw()  
@@ -525,43 +1802,71 @@ class EnrollmentServices:
             if student and course:
                 if enrollment.course_code in student.enrolled_courses:
                     student.enrolled_courses.remove(enrollment.course_code)
+                    student.version += 1
                 if enrollment.student_id in course.current_enrollment:
                     course.current_enrollment.remove(enrollment.student_id)
+                    course.version += 1
+            semester_courses = self.semester_courses.get((enrollment.student_id, enrollment.semester))
+            if semester_courses and enrollment.course_code in semester_courses:
+                semester_courses.remove(enrollment.course_code)
+            self.student_schedules.pop((enrollment.student_id, enrollment.semester), None)
+            self.change_log.append(enrollment)
             return True, f"Enrollment {enrollment.enrollment_id} successfully withdrawn."
         return False, message
+
+    def _get_course_slots(self, course):
+        from types import MappingProxyType
+
+        cached = self.course_slots.get(course.course_code)
+        if cached and cached[0] == course.schedule_version:
+            return cached[1]
+
+        slots = []
+        for day, start_time, end_time, venue in course.schedule:
+            sort_key = (DAY_ORDER.get(day[:3].lower(), 7), time_to_minutes(start_time))
+            slots.append((sort_key, MappingProxyType({
+                "course_code": course.course_code,
+                "course_name": course.course_name,
+                "day": day,
+                "start_time": start_time,
+                "end_time": end_time,
+                "venue": venue,
+                "lecturer": course.lecturer
+            })))
+        self.course_slots[course.course_code] = (course.schedule_version, slots)
+        return slots
+
+    def _semester_course_codes(self, student, semester):
+        if semester is None:
+            return student.enrolled_courses
+        return self.semester_courses.get((student.student_id, semester), [])
     
     def get_student_schedule(self, student_id, semester):
         student = self.student_records.get(student_id)
         if not student:
             return None, f"Student {student_id} not found."
-        
-        schedule = []
-        for enrolled_course_code in student.enrolled_courses:
-            course = self.course_catalog.get(enrolled_course_code)
-            if course:
-                for day, start_time, end_time, venue in course.schedule:
-                    schedule.append(
-                        {
-                            "course_code": course.course_code,
-                            "course_name": course.course_name,
-                            "day": day,
-                            "start_time": start_time,
-                            "end_time": end_time,
-                            "venue": venue,
-                            "lecturer": course.lecturer
-                        }
-                    )
-        
-        day_order = {"Monday": 1, "Tuesday": 2, "Wednesday": 3, "Thursday": 4, "Friday": 5, "Saturday": 6, "Sunday": 7}
-        schedule.sort(key=lambda x: (day_order.get(x['day'], 8), x['start_time']))
+
+        courses = [self.course_catalog[code] for code in self._semester_course_codes(student, semester) if code in self.course_catalog]
+        versions = (student.version, tuple(course.schedule_version for course in courses))
+
+        key = (student_id, semester)
+        cached = self.student_schedules.get(key)
+        if cached and cached[0] == versions:
+            return cached[1], "Schedule retrieved successfully"
+
+        slots = []
+        for course in courses:
+            slots.extend(self._get_course_slots(course))
+        slots.sort(key=lambda slot: slot[0])
+        schedule = tuple(entry for sort_key, entry in slots)
+        self.student_schedules[key] = (versions, schedule)
         return schedule, "Schedule retrieved successfully"
     
     def store_schedule(self, student_id, semester):
-        student = self.student_records.get(student_id)
-        if not student:
-            return None, f"Student {student_id} not found."
-        
         schedule, message = self.get_student_schedule(student_id, semester)
+        if schedule is None:
+            return None, message
+
         try:
             with open("schedule_data.txt", "w") as file:
                 file.write(f"Schedule for Student ID: {student_id}, Semester: {semester}\n")
@@ -570,19 +1875,87 @@ class EnrollmentServices:
             return f"Schedule data for student {student_id} stored in schedule_data.txt."
         except Exception as e:
             return f"Error storing schedule data: {e}"
+
+    def _ics_events(self, student, semester, term_start, weeks):
+        from datetime import datetime, timedelta
+
+        first_day = datetime.strptime(term_start, "%d-%m-%Y")
+        schedule, message = self.get_student_schedule(student.student_id, semester)
+        for entry in schedule:
+            weekday = DAY_ORDER.get(entry["day"][:3].lower())
+            if weekday is None:
+                continue
+            date = first_day + timedelta(days=(weekday - first_day.weekday()) % 7)
+            stamp = date.strftime("%Y%m%d")
+            start = entry["start_time"].replace(":", "").zfill(4)
+            end = entry["end_time"].replace(":", "").zfill(4)
+            yield (
+                "BEGIN:VEVENT\r\n"
+                f"UID:{student.student_id}-{semester}-{entry['course_code']}-{stamp}{start}@pcos\r\n"
+                f"DTSTART:{stamp}T{start}00\r\n"
+                f"DTEND:{stamp}T{end}00\r\n"
+                f"RRULE:FREQ=WEEKLY;COUNT={weeks}\r\n"
+                f"SUMMARY:{entry['course_code']} - {entry['course_name']}\r\n"
+                f"LOCATION:{entry['venue']}\r\n"
+                f"DESCRIPTION:Lecturer: {entry['lecturer']}\r\n"
+                f"ATTENDEE;CN={student.name}:mailto:{student.email}\r\n"
+                "END:VEVENT\r\n"
+            )
+
+    def _csv_rows(self, student, semester):
+        schedule, message = self.get_student_schedule(student.student_id, semester)
+        for entry in schedule:
+            yield [student.student_id, semester, entry["day"], entry["start_time"], entry["end_time"],
+                   entry["course_code"], entry["course_name"], entry["venue"], entry["lecturer"]]
+
+    def export_timetables(self, filename, semester=None, fmt="csv", student_ids=None, term_start=None, weeks=14):
+        import csv
+
+        if fmt not in ["csv", "ics"]:
+            return False, f"Unknown timetable format: {fmt}."
+        if fmt == "ics" and not term_start:
+            return False, "A term start date (dd-mm-yyyy) is required for iCalendar export."
+        if student_ids is None:
+            student_ids = list(self.student_records)
+
+        count = 0
+        try:
+            with open(filename, "w", newline="", buffering=1 << 20) as file:
+                if fmt == "csv":
+                    writer = csv.writer(file)
+                    writer.writerow(["student_id", "semester", "day", "start_time", "end_time",
+                                     "course_code", "course_name", "venue", "lecturer"])
+                    for student_id in student_ids:
+                        student = self.student_records.get(student_id)
+                        if student:
+                            writer.writerows(self._csv_rows(student, semester))
+                            count += 1
+                else:
+                    file.write("BEGIN:VCALENDAR\r\nVERSION:2.0\r\nPRODID:-//PCOS//Timetables//EN\r\n")
+                    for student_id in student_ids:
+                        student = self.student_records.get(student_id)
+                        if student:
+                            file.writelines(self._ics_events(student, semester, term_start, weeks))
+                            count += 1
+                    file.write("END:VCALENDAR\r\n")
+            return True, f"Timetables for {count} students exported to {filename}."
+        except Exception as e:
+            return False, f"Error exporting timetables: {e}"
     
     def store_enrollment_data(self, enrollment, filename):
         return enrollment.store_enrollment_data("enrollment_data.txt")  
     
 class GradingService:
-    def __init__(self, enrollment_records):
+    def __init__(self, enrollment_records, change_log=None):
         self.enrollment_records = enrollment_records
+        self.change_log = change_log if change_log is not None else []
 
     def assign_grade(self, enrollment_id, grade):
         enrollment = self.enrollment_records.get(enrollment_id)
         if not enrollment:
             return False, f"Enrollment {enrollment_id} not found."
         enrollment.grade = grade
+        self.change_log.append(enrollment)
         return True, f"Assigned grade {grade} to enrollment {enrollment_id}."
 
     def calculate_final_grade(self, enrollment_id, assignments_weight=0.3, exam_weight=0.7):
@@ -596,15 +1969,112 @@ class GradingService:
     def store_enrollment_data(self, enrollment, filename):
         return enrollment.store_enrollment_data("enrollment_data.txt")
 
-class FinancialServices:
-    def __init__(self, student_records):
+class SemesterRolloverService:
+    def __init__(self, enrollment_records, student_records, course_catalog, enrollment_service):
+        self.enrollment_records = enrollment_records
         self.student_records = student_records
+        self.course_catalog = course_catalog
+        self.enrollment_service = enrollment_service
+        self.archives = {}
+        self.tuition_postings = {}
 
-    def process_payment(self, student_id, amount, date_str):
-        student = self.student_records.get(student_id)
+    def _finalize(self, enrollment):
+        if enrollment.status != "ACTIVE":
+            return None
+        if enrollment.grade is None:
+            enrollment.grade = enrollment.final_grade_value or enrollment.calculate_final_grade()
+        if enrollment.grade is None:
+            enrollment.status = "INCOMPLETE"
+        elif enrollment.is_passing():
+            enrollment.status = "COMPLETED"
+        else:
+            enrollment.status = "FAILED"
+        return enrollment.grade
+
+    def _tuition_for(self, student, next_term_tuition):
+        if isinstance(next_term_tuition, dict):
+            return next_term_tuition.get(student.program, next_term_tuition.get("default", 0))
+        return next_term_tuition
+
+    def close_semester(self, semester, next_term_tuition=None):
+        if semester in self.archives:
+            return None, f"Semester {semester} has already been closed."
+
+        closing = {key: enrollment for key, enrollment in self.enrollment_records.items() if enrollment.semester == semester}
+        if not closing:
+            return None, f"No enrollments found for semester {semester}."
+
+        summary = {"semester": semester, "archived": len(closing), "COMPLETED": 0, "FAILED": 0, "INCOMPLETE": 0,
+                   "WITHDRAWN": 0, "students": 0, "tuition_posted": 0.0}
+        student_courses = {}
+        course_students = {}
+        new_grades = {}
+        active_students = set()
+        for enrollment in closing.values():
+            grade = self._finalize(enrollment)
+            summary[enrollment.status] = summary.get(enrollment.status, 0) + 1
+            student_courses.setdefault(enrollment.student_id, set()).add(enrollment.course_code)
+            course_students.setdefault(enrollment.course_code, set()).add(enrollment.student_id)
+            if grade is not None:
+                new_grades.setdefault(enrollment.student_id, []).append((enrollment.course_code, grade))
+            if enrollment.status != "WITHDRAWN":
+                active_students.add(enrollment.student_id)
+
+        for key in closing:
+            del self.enrollment_records[key]
+        self.archives[semester] = closing
+
+        for student_id, course_codes in student_courses.items():
+            student = self.student_records.get(student_id)
+            if not student:
+                continue
+            student.enrolled_courses = [code for code in student.enrolled_courses if code not in course_codes]
+            grades = new_grades.get(student_id)
+            if grades:
+                for course_code, grade in grades:
+                    if (course_code, semester) not in student.grade_positions:
+                        student.record_grade(course_code, semester, grade)
+                student.calculate_gpa()
+            else:
+                student.version += 1
+        summary["students"] = len(student_courses)
+
+        for course_code, student_ids in course_students.items():
+            course = self.course_catalog.get(course_code)
+            if course:
+                course.current_enrollment = [sid for sid in course.current_enrollment if sid not in student_ids]
+                course.version += 1
+
+        for student_id in student_courses:
+            self.enrollment_service.semester_courses.pop((student_id, semester), None)
+            self.enrollment_service.student_schedules.pop((student_id, semester), None)
+
+        postings = self.tuition_postings[semester] = {}
+        if next_term_tuition:
+            for student_id in active_students:
+                student = self.student_records.get(student_id)
+                if not student:
+                    continue
+                amount = self._tuition_for(student, next_term_tuition)
+                if amount:
+                    student.add_tuition_fee(amount)
+                    postings[student_id] = amount
+                    summary["tuition_posted"] += amount
+
+        return summary, f"Semester {semester} closed: {len(closing)} enrollments archived."
+
+    def get_archived_enrollments(self, semester):
+        return self.archives.get(semester, {})
+
+class FinancialServices:
+    def __init__(self, student_records):
+        self.student_records = student_records
+
+    def process_payment(self, student_id, amount, date_str, lean=False):
+        student = self.student_records.get(student_id)
         if not student:
-            return False, f"Student {student_id} not found."
-        return student.pay_fees(amount, date_str)
+            return make_result(lean, Status.NOT_FOUND, "Student {0} not found.", student_id)
+        return student.pay_fees(amount, date_str, lean)
 
     def calculate_student_balance(self, student_id, total_fees):
         student = self.student_records.get(student_id)
@@ -614,7 +2084,1190 @@ class FinancialServices:
         return balance, f"Student {student_id} has a balance of {balance}."
     
     def store_financial_data(self, student, filename):
-        return student.store_student_data("student_data.txt")  
+        return student.store_student_data("student_data.txt")
+
+class Staff:
+    def __init__(self, staff_id, name, email, department, basic_salary, position=""):
+        self.staff_id = staff_id
+        self.name = name
+        self.email = email
+        self.department = department
+        self.position = position
+        self.basic_salary = basic_salary
+        self.allowances = {}
+        self.deductions = {}
+        self.status = "ACTIVE"
+
+        valid, message = self.validate()
+        if not valid:
+            raise ValueError(f"Invalid staff data for {self.staff_id}! {message}")
+
+    def validate(self):
+        if not self.staff_id or len(self.staff_id.strip()) == 0:
+            return False, "Invalid staff ID!"
+        if not validate_email(self.email):
+            return False, "Invalid email!"
+        if self.basic_salary < 0:
+            return False, "Basic salary cannot be negative!"
+        return True, "Valid staff data!"
+
+    def add_allowance(self, name, amount):
+        if amount < 0:
+            return False, "Allowance amount cannot be negative."
+        self.allowances[name] = amount
+        return True, f"Allowance {name} of {amount} set for staff {self.staff_id}."
+
+    def add_deduction(self, name, amount):
+        if amount < 0:
+            return False, "Deduction amount cannot be negative."
+        self.deductions[name] = amount
+        return True, f"Deduction {name} of {amount} set for staff {self.staff_id}."
+
+    def calculate_gross_salary(self):
+        return self.basic_salary + sum(self.allowances.values())
+
+    def store_staff_data(self, filename):
+        try:
+            with open(filename, "w") as file:
+                file.write(f"Staff ID: {self.staff_id}\n")
+                file.write(f"Name: {self.name}\n")
+                file.write(f"Email: {self.email}\n")
+                file.write(f"Department: {self.department}\n")
+                file.write(f"Position: {self.position}\n")
+                file.write(f"Basic Salary: {self.basic_salary:.2f}\n")
+                file.write("Allowances:\n")
+                for name, amount in self.allowances.items():
+                    file.write(f"  {name}: {amount:.2f}\n")
+                file.write("Deductions:\n")
+                for name, amount in self.deductions.items():
+                    file.write(f"  {name}: {amount:.2f}\n")
+            return f"Staff data for {self.staff_id} stored in {filename}."
+        except Exception as e:
+            return f"Error storing staff data: {e}"
+
+class PayrollRun:
+    def __init__(self, period, staff, allowance_items, deduction_items, basic, allowances, gross, pension, tax,
+                 other_deductions, net):
+        self.period = period
+        self.staff = staff
+        self.allowance_items = allowance_items
+        self.deduction_items = deduction_items
+        self.basic = basic
+        self.allowances = allowances
+        self.gross = gross
+        self.pension = pension
+        self.tax = tax
+        self.other_deductions = other_deductions
+        self.net = net
+        self.positions = {member.staff_id: i for i, member in enumerate(staff)}
+
+    def __len__(self):
+        return len(self.staff)
+
+    def total_net_pay(self):
+        return float(self.net.sum())
+
+    def get_payslip(self, staff_id):
+        i = self.positions.get(staff_id)
+        return None if i is None else self._payslip(i)
+
+    def _payslip(self, i):
+        member = self.staff[i]
+        return {
+            "period": self.period,
+            "staff_id": member.staff_id,
+            "name": member.name,
+            "department": member.department,
+            "basic_salary": float(self.basic[i]),
+            "allowances": dict(self.allowance_items[i]),
+            "gross_salary": float(self.gross[i]),
+            "pension": float(self.pension[i]),
+            "tax": float(self.tax[i]),
+            "deductions": dict(self.deduction_items[i]),
+            "net_salary": float(self.net[i])
+        }
+
+    def payslip_lines(self):
+        for i, member in enumerate(self.staff):
+            lines = [
+                f"PAYSLIP {self.period} - {member.staff_id}\n",
+                f"Name: {member.name}\n",
+                f"Department: {member.department}\n",
+                f"Basic Salary: {self.basic[i]:.2f}\n"
+            ]
+            for name, amount in self.allowance_items[i].items():
+                lines.append(f"  Allowance {name}: {amount:.2f}\n")
+            lines.append(f"Gross Salary: {self.gross[i]:.2f}\n")
+            lines.append(f"  Pension: {self.pension[i]:.2f}\n")
+            lines.append(f"  Income Tax: {self.tax[i]:.2f}\n")
+            for name, amount in self.deduction_items[i].items():
+                lines.append(f"  Deduction {name}: {amount:.2f}\n")
+            lines.append(f"Net Salary: {self.net[i]:.2f}\n")
+            lines.append("-" * 40 + "\n")
+            yield "".join(lines)
+
+class PayrollServices:
+    def __init__(self, staff_records):
+        self.staff_records = staff_records
+        self.tax_bands = [(24000, 0.10), (32333, 0.25), (None, 0.30)]
+        self.pension_rate = 0.06
+        self.payroll_runs = {}
+
+    def run_payroll(self, month, year):
+        import numpy as np
+
+        if not 1 <= month <= 12:
+            return None, f"Invalid payroll month {month}."
+        period = f"{month:02d}-{year:04d}"
+
+        staff = [member for member in self.staff_records.values() if member.status == "ACTIVE"]
+        if not staff:
+            return None, "No active staff to pay."
+
+        allowance_items = [dict(member.allowances) for member in staff]
+        deduction_items = [dict(member.deductions) for member in staff]
+        basic = np.fromiter((member.basic_salary for member in staff), dtype=np.float64, count=len(staff))
+        allowances = np.fromiter((sum(items.values()) for items in allowance_items), dtype=np.float64, count=len(staff))
+        other_deductions = np.fromiter((sum(items.values()) for items in deduction_items), dtype=np.float64, count=len(staff))
+
+        gross = basic + allowances
+        pension = gross * self.pension_rate
+        taxable = gross - pension
+
+        tax = np.zeros_like(taxable)
+        lower = 0.0
+        for upper, rate in self.tax_bands:
+            if upper is None:
+                tax += np.maximum(taxable - lower, 0.0) * rate
+                break
+            tax += np.clip(taxable - lower, 0.0, upper - lower) * rate
+            lower = upper
+
+        net = gross - pension - tax - other_deductions
+
+        payroll_run = PayrollRun(period, staff, allowance_items, deduction_items, basic, allowances, gross, pension, tax,
+                                 other_deductions, net)
+        self.payroll_runs[period] = payroll_run
+        return payroll_run, f"Payroll for {period} processed for {len(staff)} staff."
+
+    def get_payslip(self, staff_id, period):
+        payroll_run = self.payroll_runs.get(period)
+        if not payroll_run:
+            return None, f"No payroll run found for {period}."
+        payslip = payroll_run.get_payslip(staff_id)
+        if not payslip:
+            return None, f"No payslip for staff {staff_id} in {period}."
+        return payslip, "Payslip retrieved successfully"
+
+    def store_payslips(self, period, filename, buffer_size=1 << 20):
+        payroll_run = self.payroll_runs.get(period)
+        if not payroll_run:
+            return False, f"No payroll run found for {period}."
+        try:
+            with open(filename, "w", buffering=buffer_size) as file:
+                file.writelines(payroll_run.payslip_lines())
+            return True, f"{len(payroll_run)} payslips for {period} stored in {filename}."
+        except Exception as e:
+            return False, f"Error storing payslips: {e}"
+
+class InvoiceRun:
+    def __init__(self, semester, students, offsets, course_codes, line_fees, subtotal, discount, total, sequence=1):
+        self.semester = semester
+        self.sequence = sequence
+        self.id_prefix = f"INV-{semester}" if sequence == 1 else f"INV-{semester}-S{sequence - 1}"
+        self.students = students
+        self.offsets = offsets
+        self.course_codes = course_codes
+        self.line_fees = line_fees
+        self.subtotal = subtotal
+        self.discount = discount
+        self.total = total
+        self.positions = {student.student_id: i for i, student in enumerate(students)}
+
+    def __len__(self):
+        return len(self.students)
+
+    def total_billed(self):
+        return float(self.total.sum())
+
+    def get_invoice(self, student_id):
+        i = self.positions.get(student_id)
+        return None if i is None else self._invoice(i)
+
+    def _invoice(self, i):
+        student = self.students[i]
+        start, end = self.offsets[i], self.offsets[i + 1]
+        return {
+            "invoice_id": f"{self.id_prefix}-{i + 1:06d}",
+            "semester": self.semester,
+            "student_id": student.student_id,
+            "name": student.name,
+            "program": student.program,
+            "lines": [(code, float(fee)) for code, fee in zip(self.course_codes[start:end], self.line_fees[start:end])],
+            "subtotal": float(self.subtotal[i]),
+            "discount": float(self.discount[i]),
+            "total": float(self.total[i])
+        }
+
+    def invoices(self):
+        for i in range(len(self.students)):
+            yield self._invoice(i)
+
+    def invoice_lines(self):
+        for i, student in enumerate(self.students):
+            start, end = self.offsets[i], self.offsets[i + 1]
+            lines = [
+                f"INVOICE {self.id_prefix}-{i + 1:06d}\n",
+                f"Student: {student.student_id} - {student.name}\n",
+                f"Program: {student.program}\n"
+            ]
+            for code, fee in zip(self.course_codes[start:end], self.line_fees[start:end]):
+                lines.append(f"  {code}: {fee:.2f}\n")
+            lines.append(f"Subtotal: {self.subtotal[i]:.2f}\n")
+            if self.discount[i]:
+                lines.append(f"  Discount: {self.discount[i]:.2f}\n")
+            lines.append(f"Total Due: {self.total[i]:.2f}\n")
+            lines.append("-" * 40 + "\n")
+            yield "".join(lines)
+
+class InvoicingService:
+    def __init__(self, course_catalog, student_records, semester_courses):
+        self.course_catalog = course_catalog
+        self.student_records = student_records
+        self.semester_courses = semester_courses
+        self.base_fee = 50000
+        self.prefix_surcharges = {"CS": 20000, "SE": 25000}
+        self.per_credit_fee = 0
+        self.use_course_fee = True
+        self.program_discounts = {}
+        self.invoice_runs = {}
+        self.invoiced = {}
+
+    def course_fee(self, course):
+        if self.use_course_fee and course.fee:
+            fee = course.fee
+        else:
+            fee = course._calculate_fee(self.base_fee, self.prefix_surcharges)
+        return fee + self.per_credit_fee * course.credits
+
+    def run_invoicing(self, semester, post=True):
+        import numpy as np
+
+        previous_runs = self.invoice_runs.get(semester, [])
+        course_positions = {}
+        course_fees = []
+        students = []
+        counts = []
+        line_courses = []
+        line_codes = []
+        for (student_id, term), codes in self.semester_courses.items():
+            student = self.student_records.get(student_id)
+            if term != semester or not codes or not student:
+                continue
+            billed = self.invoiced.get((student_id, term))
+            if billed:
+                codes = [code for code in codes if code not in billed]
+                if not codes:
+                    continue
+            for code in codes:
+                position = course_positions.get(code)
+                if position is None:
+                    course = self.course_catalog.get(code)
+                    position = course_positions[code] = len(course_fees)
+                    course_fees.append(self.course_fee(course) if course else 0)
+                line_courses.append(position)
+            line_codes.extend(codes)
+            students.append(student)
+            counts.append(len(codes))
+        if not students:
+            if previous_runs:
+                return None, f"No un-invoiced enrollments for {semester}."
+            return None, f"No enrollments to invoice for {semester}."
+
+        line_fees = np.asarray(course_fees, dtype=np.float64)[np.asarray(line_courses, dtype=np.int64)]
+        counts = np.asarray(counts, dtype=np.int64)
+        offsets = np.zeros(len(students) + 1, dtype=np.int64)
+        np.cumsum(counts, out=offsets[1:])
+        subtotal = np.add.reduceat(line_fees, offsets[:-1])
+        rates = np.fromiter((self.program_discounts.get(student.program, 0.0) for student in students),
+                            dtype=np.float64, count=len(students))
+        discount = np.round(subtotal * rates, 2)
+        total = subtotal - discount
+
+        offsets = offsets.tolist()
+        invoice_run = InvoiceRun(semester, students, offsets, line_codes, line_fees, subtotal, discount, total,
+                                 len(previous_runs) + 1)
+        self.invoice_runs.setdefault(semester, []).append(invoice_run)
+        for i, student in enumerate(students):
+            self.invoiced.setdefault((student.student_id, semester), set()).update(line_codes[offsets[i]:offsets[i + 1]])
+        if post:
+            for student, amount in zip(students, total.tolist()):
+                student.add_tuition_fee(amount)
+        return invoice_run, f"{len(students)} invoices issued for {semester} totalling {invoice_run.total_billed():.2f}."
+
+    def get_invoice(self, student_id, semester):
+        """Return the student's most recent invoice for the semester"""
+        invoice_runs = self.invoice_runs.get(semester)
+        if not invoice_runs:
+            return None, f"No invoices issued for {semester}."
+        for invoice_run in reversed(invoice_runs):
+            invoice = invoice_run.get_invoice(student_id)
+            if invoice:
+                return invoice, "Invoice retrieved successfully"
+        return None, f"No invoice for student {student_id} in {semester}."
+
+    def get_invoices(self, student_id, semester):
+        invoices = [invoice_run.get_invoice(student_id) for invoice_run in self.invoice_runs.get(semester, [])]
+        return [invoice for invoice in invoices if invoice]
+
+    def store_invoices(self, semester, filename, buffer_size=1 << 20):
+        invoice_runs = self.invoice_runs.get(semester)
+        if not invoice_runs:
+            return False, f"No invoices issued for {semester}."
+        try:
+            with open(filename, "w", buffering=buffer_size) as file:
+                for invoice_run in invoice_runs:
+                    file.writelines(invoice_run.invoice_lines())
+            count = sum(len(invoice_run) for invoice_run in invoice_runs)
+            return True, f"{count} invoices for {semester} stored in {filename}."
+        except Exception as e:
+            return False, f"Error storing invoices: {e}"
+
+REPORT_FIELDS = {
+    "student_report": ["student_id", "name", "email", "program", "admission_year", "gpa", "tuition_balance",
+                       "enrolled_courses", "completed_courses", "fees_paid", "balance", "payment_history"],
+    "student_transcript": ["student_id", "name", "program", "admission_year", "gpa", "total_credits", "completed_courses"],
+    "course_report": ["course_code", "course_name", "lecturer", "current_enrollment", "schedule", "fee", "credits",
+                      "max_capacity", "available_seats"]
+}
+
+REPORT_FORMATS = {"text": "txt", "csv": "csv", "jsonl": "jsonl"}
+
+def _render_report_text(report_type, row):
+    if report_type == "student_report":
+        lines = [
+            f"Student Report for {row['student_id']}\n",
+            f"Name: {row['name']}\n",
+            f"Email: {row['email']}\n",
+            f"Program: {row['program']}\n",
+            f"Admission Year: {row['admission_year']}\n",
+            f"GPA: {row['gpa']}\n",
+            f"Tuition Balance: ${row['tuition_balance']:.2f}\n",
+            "Enrolled Courses:\n"
+        ]
+        lines.extend(f"  {course_code}\n" for course_code in row["enrolled_courses"])
+        lines.append("Completed Courses:\n")
+        lines.extend(f"  {course_code}: {grade}\n" for course_code, grade in row["completed_courses"])
+        lines.append(f"Fees Paid: {row['fees_paid']}\n")
+        lines.append(f"Balance: {row['balance']}\n")
+        lines.append("Payment History:\n")
+        lines.extend(f"  {amount} on {date_str}\n" for amount, date_str in row["payment_history"])
+    elif report_type == "student_transcript":
+        lines = [
+            f"Transcript for {row['name']} (ID: {row['student_id']})\n",
+            f"Program: {row['program']}\n",
+            f"Admission Year: {row['admission_year']}\n",
+            f"GPA: {row['gpa']}\n",
+            f"Total Credits: {row['total_credits']}\n",
+            "Completed Courses:\n"
+        ]
+        lines.extend(f"  {course_code}: {grade}\n" for course_code, grade in row["completed_courses"])
+    else:
+        lines = [
+            f"Course Report for {row['course_code']}\n",
+            f"Course Name: {row['course_name']}\n",
+            f"Lecturer: {row['lecturer']}\n",
+            f"Current Enrollment: {len(row['current_enrollment'])}\n",
+            "Schedule:\n"
+        ]
+        lines.extend(f"  {day}: {start_time} - {end_time} at {venue}\n" for day, start_time, end_time, venue in row["schedule"])
+        lines.append(f"Fee: {row['fee']}\n")
+        lines.append(f"Credits: {row['credits']}\n")
+        lines.append(f"Max Capacity: {row['max_capacity']}\n")
+        lines.append(f"Available Seats: {row['available_seats']}\n")
+    return "".join(lines)
+
+def _csv_value(value):
+    if isinstance(value, list):
+        return ";".join(":".join(str(part) for part in item) if isinstance(item, tuple) else str(item) for item in value)
+    return value
+
+def _render_report_chunk(args):
+    import csv
+    import io
+    import json
+
+    report_type, fmt, rows = args
+    if fmt == "text":
+        return "\n".join(_render_report_text(report_type, row) for row in rows) + "\n"
+    if fmt == "jsonl":
+        return "".join(json.dumps(row) + "\n" for row in rows)
+
+    fields = REPORT_FIELDS[report_type]
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    for row in rows:
+        writer.writerow([_csv_value(row[field]) for field in fields])
+    return buffer.getvalue()
+
+def _store_report_shard(args):
+    import os
+
+    report_type, fmt, directory, rows = args
+    extension = REPORT_FORMATS[fmt]
+    header = ",".join(REPORT_FIELDS[report_type]) + "\n" if fmt == "csv" else ""
+    for key, row in rows:
+        if fmt == "text":
+            rendered = _render_report_text(report_type, row)
+        else:
+            rendered = header + _render_report_chunk((report_type, fmt, [row]))
+        with open(os.path.join(directory, f"{key}.{extension}"), "w") as file:
+            file.write(rendered)
+    return len(rows)
+
+class ReportEngine:
+    def __init__(self, course_catalog, student_records):
+        self.course_catalog = course_catalog
+        self.student_records = student_records
+        self.chunk_size = 500
+        self.buffer_size = 1 << 20
+
+    def _build_row(self, report_type, key):
+        if report_type == "course_report":
+            course = self.course_catalog.get(key)
+            if not course:
+                return None
+            return {
+                "course_code": course.course_code,
+                "course_name": course.course_name,
+                "lecturer": course.lecturer,
+                "current_enrollment": list(course.current_enrollment),
+                "schedule": list(course.schedule),
+                "fee": course.fee,
+                "credits": course.credits,
+                "max_capacity": course.max_capacity,
+                "available_seats": course.get_available_seats()
+            }
+
+        student = self.student_records.get(key)
+        if not student:
+            return None
+        if report_type == "student_transcript":
+            return {
+                "student_id": student.student_id,
+                "name": student.name,
+                "program": student.program,
+                "admission_year": student.admission_year,
+                "gpa": student.gpa,
+                "total_credits": student.total_credits,
+                "completed_courses": list(student.completed_courses)
+            }
+        return {
+            "student_id": student.student_id,
+            "name": student.name,
+            "email": student.email,
+            "program": student.program,
+            "admission_year": student.admission_year,
+            "gpa": student.gpa,
+            "tuition_balance": student.tuition_balance,
+            "enrolled_courses": list(student.enrolled_courses),
+            "completed_courses": list(student.completed_courses),
+            "fees_paid": student.fees_paid,
+            "balance": student.balance,
+            "payment_history": list(student.payment_history)
+        }
+
+    def _check(self, report_type, fmt):
+        if report_type not in REPORT_FIELDS:
+            return False, f"Unknown report type: {report_type}."
+        if fmt not in REPORT_FORMATS:
+            return False, f"Unknown report format: {fmt}."
+        return True, "Valid report request"
+
+    def _default_keys(self, report_type):
+        if report_type == "course_report":
+            return list(self.course_catalog)
+        return list(self.student_records)
+
+    def _chunks(self, report_type, keys):
+        chunk = []
+        for key in keys:
+            row = self._build_row(report_type, key)
+            if row is None:
+                continue
+            chunk.append((key, row))
+            if len(chunk) >= self.chunk_size:
+                yield chunk
+                chunk = []
+        if chunk:
+            yield chunk
+
+    def render(self, report_type, key, fmt="text"):
+        valid, message = self._check(report_type, fmt)
+        if not valid:
+            return None, message
+        row = self._build_row(report_type, key)
+        if row is None:
+            return None, f"Record {key} not found."
+        if fmt == "text":
+            return _render_report_text(report_type, row), "Report rendered successfully"
+        return _render_report_chunk((report_type, fmt, [row])), "Report rendered successfully"
+
+    def store_reports(self, report_type, filename, keys=None, fmt="text", workers=1):
+        valid, message = self._check(report_type, fmt)
+        if not valid:
+            return False, message
+        if keys is None:
+            keys = self._default_keys(report_type)
+
+        stored = [0]
+
+        def jobs():
+            for chunk in self._chunks(report_type, keys):
+                stored[0] += len(chunk)
+                yield report_type, fmt, [row for key, row in chunk]
+
+        try:
+            with open(filename, "w", buffering=self.buffer_size) as file:
+                if fmt == "csv":
+                    file.write(",".join(REPORT_FIELDS[report_type]) + "\n")
+                if workers > 1:
+                    from concurrent.futures import ProcessPoolExecutor
+                    with ProcessPoolExecutor(max_workers=workers) as pool:
+                        for rendered in pool.map(_render_report_chunk, jobs()):
+                            file.write(rendered)
+                else:
+                    for job in jobs():
+                        file.write(_render_report_chunk(job))
+            return True, f"{report_type} output for {stored[0]} records stored in {filename}."
+        except Exception as e:
+            return False, f"Error storing reports: {e}"
+
+    def store_report_shards(self, report_type, directory, keys=None, fmt="text", workers=1, shard_count=16):
+        import os
+        import zlib
+
+        valid, message = self._check(report_type, fmt)
+        if not valid:
+            return False, message
+        if keys is None:
+            keys = self._default_keys(report_type)
+
+        try:
+            for shard in range(shard_count):
+                os.makedirs(os.path.join(directory, f"shard_{shard:02d}"), exist_ok=True)
+
+            jobs = []
+            for chunk in self._chunks(report_type, keys):
+                by_shard = {}
+                for key, row in chunk:
+                    shard = zlib.crc32(key.encode()) % shard_count
+                    by_shard.setdefault(shard, []).append((key, row))
+                for shard, rows in by_shard.items():
+                    jobs.append((report_type, fmt, os.path.join(directory, f"shard_{shard:02d}"), rows))
+
+            if workers > 1:
+                from concurrent.futures import ProcessPoolExecutor
+                with ProcessPoolExecutor(max_workers=workers) as pool:
+                    stored = sum(pool.map(_store_report_shard, jobs))
+            else:
+                stored = sum(_store_report_shard(job) for job in jobs)
+            return True, f"{stored} {report_type} files stored under {directory}."
+        except Exception as e:
+            return False, f"Error storing report shards: {e}"
+
+class ReportCache:
+    def __init__(self, max_entries=1024):
+        from collections import OrderedDict
+
+        self.max_entries = max_entries
+        self.entries = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key, version):
+        entry = self.entries.get(key)
+        if entry is None or entry[0] != version:
+            self.misses += 1
+            return None
+        self.entries.move_to_end(key)
+        self.hits += 1
+        return entry[1]
+
+    def put(self, key, version, snapshot):
+        self.entries[key] = (version, snapshot)
+        self.entries.move_to_end(key)
+        while len(self.entries) > self.max_entries:
+            self.entries.popitem(last=False)
+            self.evictions += 1
+        return snapshot
+
+    def invalidate(self, key=None):
+        if key is None:
+            self.entries.clear()
+        else:
+            self.entries.pop(key, None)
+
+    def get_metrics(self):
+        lookups = self.hits + self.misses
+        return {
+            "entries": len(self.entries),
+            "max_entries": self.max_entries,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "hit_rate": self.hits / lookups if lookups else 0.0
+        }
+
+class SearchIndex:
+    def __init__(self, field_weights, max_prefix_tokens=256, max_fuzzy_tokens=32, min_similarity=0.35,
+                 max_postings=5000):
+        self.field_weights = field_weights
+        self.max_weight = max(field_weights.values(), default=1.0)
+        self.max_prefix_tokens = max_prefix_tokens
+        self.max_postings = max_postings
+        self.max_fuzzy_tokens = max_fuzzy_tokens
+        self.min_similarity = min_similarity
+        self.documents = {}
+        self.postings = {}
+        self.tokens = []
+        self.pending_tokens = []
+        self.trigrams = {}
+        self.trigram_arrays = {}
+        self.token_ids = {}
+        self.token_names = []
+
+    def __len__(self):
+        return len(self.documents)
+
+    @staticmethod
+    def tokenize(text):
+        import re
+        return re.findall(r"[a-z]+|[0-9]+", str(text).lower())
+
+    @staticmethod
+    def _trigrams(token):
+        padded = f"${token}$"
+        return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+    def add(self, doc_id, fields):
+        if doc_id in self.documents:
+            self.remove(doc_id)
+        terms = {}
+        for field, text in fields.items():
+            weight = self.field_weights.get(field, 1.0)
+            for token in self.tokenize(text):
+                if weight > terms.get(token, 0.0):
+                    terms[token] = weight
+
+        for token, weight in terms.items():
+            posting = self.postings.get(token)
+            if posting is None:
+                posting = self.postings[token] = {}
+                self.pending_tokens.append(token)
+                if token not in self.token_ids:
+                    self.token_ids[token] = len(self.token_names)
+                    self.token_names.append(token)
+                for trigram in self._trigrams(token):
+                    self.trigrams.setdefault(trigram, set()).add(token)
+                    self.trigram_arrays.pop(trigram, None)
+            posting[doc_id] = weight
+        self.documents[doc_id] = terms
+
+    def _sorted_tokens(self):
+        from bisect import insort
+
+        if self.pending_tokens:
+            if len(self.pending_tokens) < 64:
+                for token in self.pending_tokens:
+                    insort(self.tokens, token)
+            else:
+                self.tokens.extend(self.pending_tokens)
+                self.tokens.sort()
+            self.pending_tokens = []
+        return self.tokens
+
+    def remove(self, doc_id):
+        from bisect import bisect_left
+
+        terms = self.documents.pop(doc_id, None)
+        if terms is None:
+            return False
+        for token in terms:
+            posting = self.postings[token]
+            del posting[doc_id]
+            if not posting:
+                del self.postings[token]
+                tokens = self._sorted_tokens()
+                del tokens[bisect_left(tokens, token)]
+                for trigram in self._trigrams(token):
+                    self.trigrams[trigram].discard(token)
+                    self.trigram_arrays.pop(trigram, None)
+        return True
+
+    def _prefix_tokens(self, prefix):
+        from bisect import bisect_left
+
+        tokens = self._sorted_tokens()
+        start = bisect_left(tokens, prefix)
+        end = bisect_left(tokens, prefix + "~", start, min(start + self.max_prefix_tokens, len(tokens)))
+        return tokens[start:end]
+
+    def _trigram_array(self, gram):
+        """Sorted token ids and lengths for a trigram, cached until the trigram's token set changes"""
+        import numpy as np
+
+        arrays = self.trigram_arrays.get(gram)
+        if arrays is None:
+            tokens = sorted(self.trigrams.get(gram, ()), key=self.token_ids.__getitem__)
+            arrays = self.trigram_arrays[gram] = (
+                np.fromiter((self.token_ids[token] for token in tokens), dtype=np.int64, count=len(tokens)),
+                np.fromiter((len(token) for token in tokens), dtype=np.float64, count=len(tokens))
+            )
+        return arrays
+
+    def _fuzzy_tokens(self, term):
+        """Return up to max_fuzzy_tokens (token, similarity) pairs sharing trigrams with term, best first"""
+        import math
+        import numpy as np
+
+        grams = sorted(self._trigrams(term), key=lambda gram: len(self.trigrams.get(gram, ())))
+        needed = max(1, math.ceil(self.min_similarity * len(grams) / (2.0 - self.min_similarity)))
+        split = len(grams) - needed + 1
+        arrays = [self._trigram_array(gram) for gram in grams]
+        ids = np.concatenate([ids for ids, _ in arrays[:split]])
+        if not len(ids):
+            return []
+        lengths = np.concatenate([lengths for _, lengths in arrays[:split]])
+        ids, first, shared = np.unique(ids, return_index=True, return_counts=True)
+        lengths = lengths[first]
+        for gram_ids, _ in arrays[split:]:
+            if len(gram_ids):
+                shared += gram_ids[np.minimum(np.searchsorted(gram_ids, ids), len(gram_ids) - 1)] == ids
+
+        similarity = 2.0 * shared / (len(grams) + lengths)
+        keep = np.flatnonzero(similarity >= self.min_similarity)
+        if len(keep) > self.max_fuzzy_tokens:
+            keep = keep[np.argpartition(-similarity[keep], self.max_fuzzy_tokens - 1)[:self.max_fuzzy_tokens]]
+        keep = keep[np.argsort(-similarity[keep], kind="stable")]
+        return [(self.token_names[ids[i]], float(similarity[i])) for i in keep]
+
+    def _term_tokens(self, term, expand_prefix, fuzzy):
+        """Return (token, similarity) candidates for a query term, best first"""
+        candidates = []
+        if term in self.postings:
+            candidates.append((term, 1.0))
+        if expand_prefix or not candidates:
+            prefixed = self._prefix_tokens(term)
+            if candidates and prefixed:
+                prefixed = prefixed[1:]
+            length = len(term)
+            candidates.extend((token, 0.5 + 0.5 * length / len(token)) for token in sorted(prefixed, key=len))
+        if fuzzy and not candidates:
+            candidates = [(token, similarity * 0.8) for token, similarity in self._fuzzy_tokens(term)]
+        return candidates
+
+    def _kth_score(self, scores, matches, limit):
+        import heapq
+
+        return heapq.nlargest(limit, (scores.get(doc_id, 0.0) + score for doc_id, score in matches.items()))[-1]
+
+    def _match_scored(self, scores, candidates, matches):
+        """Match candidate tokens against documents that already have a score, walking the shorter side"""
+        if len(scores) < len(candidates):
+            lookup = dict(candidates)
+            for doc_id in scores:
+                for token, weight in self.documents[doc_id].items():
+                    similarity = lookup.get(token)
+                    if similarity and weight * similarity > matches.get(doc_id, 0.0):
+                        matches[doc_id] = weight * similarity
+            return matches
+        for token, similarity in candidates:
+            posting = self.postings[token]
+            if len(posting) < len(scores):
+                pairs = [(doc_id, weight) for doc_id, weight in posting.items() if doc_id in scores]
+            else:
+                pairs = [(doc_id, posting[doc_id]) for doc_id in scores if doc_id in posting]
+            for doc_id, weight in pairs:
+                if weight * similarity > matches.get(doc_id, 0.0):
+                    matches[doc_id] = weight * similarity
+        return matches
+
+    def search(self, query, limit=10, fuzzy=True):
+        """Top documents by weighted exact, prefix (last term only) and trigram-fuzzy matches, pruned once results settle"""
+        import heapq
+        from operator import itemgetter
+
+        terms = self.tokenize(query)
+        if not terms:
+            return []
+        last = len(terms) - 1
+        term_tokens = [self._term_tokens(term, i == last, fuzzy) for i, term in enumerate(terms)]
+        order = [0]
+        if last:
+            order = sorted(range(len(terms)), key=lambda i: (len(term_tokens[i]), len(self.postings[term_tokens[i][0][0]])
+                                                             if term_tokens[i] else 0))
+        bounds = [self.max_weight * tokens[0][1] if tokens else 0.0 for tokens in term_tokens]
+
+        scores = {}
+        for position, i in enumerate(order):
+            candidates = term_tokens[i]
+            if not candidates:
+                continue
+            remaining = sum(bounds[j] for j in order[position:])
+            if len(scores) >= limit and heapq.nlargest(limit, scores.values())[-1] >= remaining:
+                matches = self._match_scored(scores, candidates, {})
+            else:
+                matches = self._match_term(scores, candidates, limit, position == last)
+            for doc_id, score in matches.items():
+                scores[doc_id] = scores.get(doc_id, 0.0) + score
+        return [(doc_id, round(score, 4)) for doc_id, score in heapq.nlargest(limit, scores.items(), key=itemgetter(1))]
+
+    def _match_term(self, scores, candidates, limit, final):
+        import heapq
+
+        matches = {}
+        prior = max(scores.values(), default=0.0) if final else None
+        ceiling = self.max_weight * candidates[0][1] if prior == 0.0 else None
+        hits = 0
+        tier = None
+        for index, (token, similarity) in enumerate(candidates):
+            if final and similarity != tier and len(matches) >= limit:
+                tier = similarity
+                kth = heapq.nlargest(limit, (scores.get(doc_id, 0.0) + score for doc_id, score in matches.items()))[-1]
+                if kth >= prior + self.max_weight * similarity:
+                    break
+                if kth >= self.max_weight * similarity:
+                    return self._match_scored(scores, candidates[index:], matches)
+            posting = self.postings[token]
+            if len(posting) > self.max_postings and len(scores) >= limit:
+                self._match_scored(scores, [(token, similarity)], matches)
+                continue
+            if ceiling is None:
+                for doc_id, weight in posting.items():
+                    if weight * similarity > matches.get(doc_id, 0.0):
+                        matches[doc_id] = weight * similarity
+                continue
+            for doc_id, weight in posting.items():
+                if weight * similarity > matches.get(doc_id, 0.0):
+                    matches[doc_id] = weight * similarity
+                    if weight * similarity >= ceiling:
+                        hits += 1
+                        if hits >= limit:
+                            return matches
+        return matches
+
+LATENCY_BUCKETS = [0.000005, 0.00001, 0.000025, 0.00005, 0.0001, 0.00025, 0.0005, 0.001,
+                   0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0]
+
+INSTRUMENTED_OPERATIONS = ["enroll_student_in_course", "process_student_payment", "book_campus_asset",
+                           "process_grade_submission", "store_payslips", "store_system_data", "store_system_report",
+                           "store_course_report", "store_student_report", "store_student_transcript",
+                           "store_reports", "store_report_shards", "store_invoices"]
+
+STATUS_CATEGORIES = {Status.NOT_FOUND: "not_found", Status.DUPLICATE: "duplicate", Status.FULL: "capacity",
+                     Status.INVALID: "validation", Status.UNAVAILABLE: "unavailable", Status.PREREQUISITE: "prerequisite"}
+
+def categorize_error(message):
+    text = str(message).lower()
+    if "not found" in text:
+        return "not_found"
+    if "already" in text:
+        return "duplicate"
+    if "full" in text or "capacity" in text:
+        return "capacity"
+    if "not available" in text or "not active" in text:
+        return "unavailable"
+    if "not assigned" in text:
+        return "permission"
+    if "prerequisite" in text:
+        return "prerequisite"
+    if text.startswith("error") or text.startswith("failed"):
+        return "io"
+    if "invalid" in text or "must be" in text or "cannot" in text or "exceeds" in text:
+        return "validation"
+    return "other"
+
+def _result_error(result):
+    if isinstance(result, Result):
+        return None if result else STATUS_CATEGORIES.get(result.status, "other")
+    if isinstance(result, tuple) and len(result) == 2:
+        if result[0] is False or result[0] is None:
+            return categorize_error(result[1])
+        return None
+    if isinstance(result, str) and (result.startswith("Error") or result.startswith("Failed") or result.endswith("not found.")):
+        return categorize_error(result)
+    return None
+
+class OperationMetrics:
+    def __init__(self, name):
+        self.name = name
+        self.count = 0
+        self.total_seconds = 0.0
+        self.max_seconds = 0.0
+        self.bucket_counts = [0] * (len(LATENCY_BUCKETS) + 1)
+        self.errors = {}
+
+    def record(self, elapsed, error):
+        from bisect import bisect_left
+
+        self.count += 1
+        self.total_seconds += elapsed
+        if elapsed > self.max_seconds:
+            self.max_seconds = elapsed
+        self.bucket_counts[bisect_left(LATENCY_BUCKETS, elapsed)] += 1
+        if error:
+            self.errors[error] = self.errors.get(error, 0) + 1
+
+    def snapshot(self):
+        return {
+            "count": self.count,
+            "errors": dict(self.errors),
+            "total_seconds": self.total_seconds,
+            "mean_seconds": self.total_seconds / self.count if self.count else 0.0,
+            "max_seconds": self.max_seconds,
+            "buckets": dict(zip([str(bound) for bound in LATENCY_BUCKETS] + ["+Inf"], self.bucket_counts))
+        }
+
+class MetricsRegistry:
+    def __init__(self):
+        self.operations = {}
+        self.profile_every = 0
+        self.profiler = None
+        self.calls = 0
+
+    def wrap(self, name, method):
+        from functools import wraps
+        from time import perf_counter
+
+        operation = self.operations.setdefault(name, OperationMetrics(name))
+
+        @wraps(method)
+        def instrumented(*args, **kwargs):
+            self.calls += 1
+            profiling = self.profiler is not None and self.calls % self.profile_every == 0
+            if profiling:
+                self.profiler.enable()
+            start = perf_counter()
+            try:
+                result = method(*args, **kwargs)
+            except Exception:
+                operation.record(perf_counter() - start, "exception")
+                raise
+            finally:
+                if profiling:
+                    self.profiler.disable()
+            operation.record(perf_counter() - start, _result_error(result))
+            return result
+
+        return instrumented
+
+    def enable_profiling(self, sample_every=100):
+        import cProfile
+
+        self.profile_every = max(1, sample_every)
+        self.profiler = cProfile.Profile()
+
+    def store_profile(self, filename):
+        if self.profiler is None:
+            return False, "Profiling is not enabled."
+        try:
+            self.profiler.dump_stats(filename)
+            return True, f"Profile stored in {filename}."
+        except Exception as e:
+            return False, f"Error storing profile: {e}"
+
+    def snapshot(self):
+        return {name: operation.snapshot() for name, operation in self.operations.items()}
+
+    def to_prometheus(self):
+        lines = [
+            "# HELP pcos_operation_total Calls per campus operation.",
+            "# TYPE pcos_operation_total counter"
+        ]
+        for name, operation in self.operations.items():
+            lines.append(f'pcos_operation_total{{operation="{name}"}} {operation.count}')
+
+        lines.append("# HELP pcos_operation_errors_total Failed calls per campus operation and error category.")
+        lines.append("# TYPE pcos_operation_errors_total counter")
+        for name, operation in self.operations.items():
+            for category, count in sorted(operation.errors.items()):
+                lines.append(f'pcos_operation_errors_total{{operation="{name}",category="{category}"}} {count}')
+
+        lines.append("# HELP pcos_operation_seconds Latency of campus operations.")
+        lines.append("# TYPE pcos_operation_seconds histogram")
+        for name, operation in self.operations.items():
+            cumulative = 0
+            for bound, count in zip(LATENCY_BUCKETS, operation.bucket_counts):
+                cumulative += count
+                lines.append(f'pcos_operation_seconds_bucket{{operation="{name}",le="{bound}"}} {cumulative}')
+            lines.append(f'pcos_operation_seconds_bucket{{operation="{name}",le="+Inf"}} {operation.count}')
+            lines.append(f'pcos_operation_seconds_sum{{operation="{name}"}} {operation.total_seconds}')
+            lines.append(f'pcos_operation_seconds_count{{operation="{name}"}} {operation.count}')
+        return "\n".join(lines) + "\n"
+
+    def store_prometheus(self, filename):
+        import os
+
+        try:
+            temp_filename = filename + ".tmp"
+            with open(temp_filename, "w") as file:
+                file.write(self.to_prometheus())
+            os.replace(temp_filename, filename)
+            return True, f"Metrics stored in {filename}."
+        except Exception as e:
+            return False, f"Error storing metrics: {e}"
+
+class EventType(IntEnum):
+    STUDENT_ADDED = 1
+    COURSE_ADDED = 2
+    ASSET_ADDED = 3
+    ENROLLED = 4
+    WITHDRAWN = 5
+    GRADED = 6
+    PAYMENT = 7
+    BOOKED = 8
+    CHECKED_IN = 9
+    CHECKED_OUT = 10
+    MAINTENANCE_SCHEDULED = 11
+    STATUS_CHANGED = 12
+    SEMESTER_CLOSED = 13
+    STAFF_ADDED = 14
+    TUITION_POSTED = 15
+    ATTENDANCE_UPDATED = 16
+    ATTENDANCE_INGESTED = 17
+    TERM_DATES_SET = 18
+    PREREQUISITE_ADDED = 19
+    REQUIREMENTS_SET = 20
+    SCHEDULE_CHANGED = 21
+    PAYROLL_RUN = 22
+    LECTURER_ASSIGNED = 23
+
+class ChangeEvent:
+    __slots__ = ("sequence", "event_type", "entity_id", "timestamp", "data")
+
+    def __init__(self, sequence, event_type, entity_id, timestamp, data):
+        self.sequence = sequence
+        self.event_type = event_type
+        self.entity_id = entity_id
+        self.timestamp = timestamp
+        self.data = data
+
+    def to_dict(self):
+        return {
+            "sequence": self.sequence,
+            "type": self.event_type.name,
+            "entity_id": self.entity_id,
+            "timestamp": self.timestamp,
+            "data": self.data
+        }
+
+    def __repr__(self):
+        return f"ChangeEvent({self.sequence}, {self.event_type.name}, {self.entity_id!r})"
+
+class EventSubscription:
+    def __init__(self, callback, batch_size=1, event_types=None):
+        self.callback = callback
+        self.batch_size = max(1, batch_size)
+        self.event_types = set(event_types) if event_types else None
+        self.pending = []
+        self.delivered = 0
+        self.errors = 0
+
+    def deliver(self):
+        if not self.pending:
+            return
+        batch, self.pending = self.pending, []
+        try:
+            self.callback(batch)
+            self.delivered += len(batch)
+        except Exception:
+            self.errors += 1
+
+class EventStream:
+    def __init__(self, capacity=65536):
+        self.capacity = capacity
+        self.buffer = [None] * capacity
+        self.next_sequence = 0
+        self.subscriptions = []
+
+    def __len__(self):
+        return min(self.next_sequence, self.capacity)
+
+    def oldest_sequence(self):
+        return max(0, self.next_sequence - self.capacity)
+
+    def publish(self, event_type, entity_id, **data):
+        import time
+
+        event = ChangeEvent(self.next_sequence, event_type, entity_id, time.time(), data)
+        self.buffer[self.next_sequence % self.capacity] = event
+        self.next_sequence += 1
+        for subscription in self.subscriptions:
+            if subscription.event_types is None or event_type in subscription.event_types:
+                subscription.pending.append(event)
+                if len(subscription.pending) >= subscription.batch_size:
+                    subscription.deliver()
+        return event
+
+    def subscribe(self, callback, batch_size=1, event_types=None):
+        subscription = EventSubscription(callback, batch_size, event_types)
+        self.subscriptions.append(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription):
+        if subscription not in self.subscriptions:
+            return False
+        subscription.deliver()
+        self.subscriptions.remove(subscription)
+        return True
+
+    def flush(self):
+        for subscription in self.subscriptions:
+            subscription.deliver()
+
+    def read(self, cursor=0, max_events=None, event_types=None):
+        """Return (events, next_cursor, dropped) for events published at or after cursor"""
+        oldest = self.oldest_sequence()
+        dropped = max(0, oldest - cursor)
+        cursor = max(cursor, oldest)
+        end = self.next_sequence if max_events is None else min(self.next_sequence, cursor + max_events)
+        events = [self.buffer[sequence % self.capacity] for sequence in range(cursor, end)]
+        if event_types:
+            events = [event for event in events if event.event_type in event_types]
+        return events, end, dropped
+
+    async def consume(self, cursor=None, batch_size=100, poll_interval=0.05, event_types=None):
+        import asyncio
+
+        if cursor is None:
+            cursor = self.next_sequence
+        while True:
+            events, cursor, dropped = self.read(cursor, batch_size, event_types)
+            if events or dropped:
+                yield events
+            else:
+                await asyncio.sleep(poll_interval)
+
+class EventFileSink:
+    def __init__(self, filename, buffer_size=1 << 16):
+        self.filename = filename
+        self.file = open(filename, "a", buffering=buffer_size)
+        self.written = 0
+
+    def __call__(self, events):
+        import json
+
+        self.file.writelines(json.dumps(event.to_dict()) + "\n" for event in events)
+        self.written += len(events)
+
+    def flush(self):
+        self.file.flush()
+
+    def close(self):
+        if not self.file.closed:
+            self.file.close()
 
 class CampusManagementSystem:
     def __init__(self):
@@ -622,9 +3275,105 @@ class CampusManagementSystem:
         self.student_records = {}
         self.enrollment_records = {}
         self.asset_records = {}
-        self.enrollment_service = EnrollmentServices(self.course_catalog, self.student_records)
-        self.grading_service = GradingService(self.enrollment_records)
+        self.staff_records = {}
+        self.booking_records = {}
+        self.user_bookings = {}
+        self.enrollment_changes = []
+        self.prerequisite_graph = PrerequisiteGraph(self.course_catalog)
+        self.enrollment_service = EnrollmentServices(self.course_catalog, self.student_records, self.enrollment_changes,
+                                                     self.prerequisite_graph)
+        self.grading_service = GradingService(self.enrollment_records, self.enrollment_changes)
         self.financial_service = FinancialServices(self.student_records)
+        self.payroll_service = PayrollServices(self.staff_records)
+        self.invoicing_service = InvoicingService(self.course_catalog, self.student_records,
+                                                  self.enrollment_service.semester_courses)
+        self.attendance_service = AttendanceService(self.course_catalog, self.enrollment_records,
+                                                    self.enrollment_service.semester_courses, self.enrollment_changes)
+        self.report_engine = ReportEngine(self.course_catalog, self.student_records)
+        self.report_cache = ReportCache()
+        self.student_index = SearchIndex({"name": 3.0, "email": 2.0, "program": 1.0})
+        self.course_index = SearchIndex({"code": 3.0, "name": 2.0, "lecturer": 1.0})
+        self.timetable_solver = TimetableSolver(self.course_catalog, self.asset_records, self.student_records)
+        self.asset_status_engine = AssetStatusEngine(self.asset_records)
+        self.asset_analytics = AssetAnalytics(self.asset_records)
+        self.academic_analytics = AcademicAnalytics(self.enrollment_records, self.student_records, self.course_catalog,
+                                                    self.enrollment_changes)
+        self.rollover_service = SemesterRolloverService(self.enrollment_records, self.student_records, self.course_catalog,
+                                                        self.enrollment_service)
+        self.current_semester = "2024A"
+        self.metrics = None
+        self.events = None
+        self.event_sinks = []
+
+    def enable_metrics(self, profile_every=0):
+        if self.metrics is None:
+            self.metrics = MetricsRegistry()
+            for name in INSTRUMENTED_OPERATIONS:
+                setattr(self, name, self.metrics.wrap(name, getattr(self, name)))
+        if profile_every:
+            self.metrics.enable_profiling(profile_every)
+        return True, "Metrics enabled."
+
+    def disable_metrics(self):
+        if self.metrics is None:
+            return False, "Metrics are not enabled."
+        for name in INSTRUMENTED_OPERATIONS:
+            self.__dict__.pop(name, None)
+        self.metrics = None
+        return True, "Metrics disabled."
+
+    def get_metrics_snapshot(self):
+        if self.metrics is None:
+            return {}
+        return self.metrics.snapshot()
+
+    def store_metrics(self, filename):
+        if self.metrics is None:
+            return False, "Metrics are not enabled."
+        return self.metrics.store_prometheus(filename)
+
+    def enable_events(self, capacity=65536):
+        if self.events is None:
+            self.events = EventStream(capacity)
+        return True, "Event stream enabled."
+
+    def disable_events(self):
+        if self.events is None:
+            return False, "Event stream is not enabled."
+        self.events.flush()
+        for sink in self.event_sinks:
+            sink.close()
+        self.event_sinks = []
+        self.events = None
+        return True, "Event stream disabled."
+
+    def _publish(self, event_type, entity_id, **data):
+        if self.events is not None:
+            self.events.publish(event_type, entity_id, **data)
+
+    def subscribe_events(self, callback, batch_size=1, event_types=None):
+        if self.events is None:
+            return None, "Event stream is not enabled."
+        return self.events.subscribe(callback, batch_size, event_types), "Subscribed to event stream."
+
+    def add_event_file_sink(self, filename, batch_size=100, event_types=None):
+        if self.events is None:
+            return False, "Event stream is not enabled."
+        try:
+            sink = EventFileSink(filename)
+        except Exception as e:
+            return False, f"Error opening event sink: {e}"
+        self.events.subscribe(sink, batch_size, event_types)
+        self.event_sinks.append(sink)
+        return True, f"Events will be written to {filename}."
+
+    def flush_events(self):
+        if self.events is None:
+            return False, "Event stream is not enabled."
+        self.events.flush()
+        for sink in self.event_sinks:
+            sink.flush()
+        return True, "Events flushed."
 
     def add_course(self, course_data):  
         try:
@@ -642,9 +3391,24 @@ class CampusManagementSystem:
                 return False, f"Course {course.course_code} already exists in catalog."
             
             self.course_catalog[course.course_code] = course
+            self.index_course(course)
+            self._publish(EventType.COURSE_ADDED, course.course_code, name=course.course_name, lecturer=course.lecturer)
+            for prerequisite_code in course_data.get("prerequisites", []):
+                added, message = self.prerequisite_graph.add_prerequisite(course.course_code, prerequisite_code)
+                if not added:
+                    return False, f"Course {course.course_code} added but {message}"
             return True, f"Course {course.course_code} added successfully."
         except Exception as e:
             return False, f"Error adding course: {e}"
+
+    def assign_course_lecturer(self, course_code, lecturer):
+        course = self.course_catalog.get(course_code)
+        if not course:
+            return False, f"Course {course_code} not found."
+        message = course.assign_lecturer(lecturer)
+        self.index_course(course)
+        self._publish(EventType.LECTURER_ASSIGNED, course_code, lecturer=lecturer)
+        return True, message
     
     def add_student(self, student_data):  
         try:
@@ -661,29 +3425,126 @@ class CampusManagementSystem:
                 return False, f"Student {student.student_id} already exists in records."
             
             self.student_records[student.student_id] = student
+            self.index_student(student)
+            self._publish(EventType.STUDENT_ADDED, student.student_id, name=student.name, program=student.program)
             return True, f"Student {student.student_id} added successfully."
         except Exception as e:
             return False, f"Error adding student: {e}"
 
-    def enroll_student_in_course(self, student_id, course_code, semester):
-        enrollment, message = self.enrollment_service.enroll_student(student_id, course_code, semester)
-        if enrollment:
-            enrollment_key = f"{student_id}_{course_code}_{semester}"
-            self.enrollment_records[enrollment_key] = enrollment
-            return True, f"Enrollment successful. ID: {enrollment.enrollment_id}"
-        return False, message
+    def index_student(self, student):
+        self.student_index.add(student.student_id, {"name": student.name, "email": student.email.split("@")[0],
+                                                     "program": student.program})
+
+    def index_course(self, course):
+        self.course_index.add(course.course_code, {"code": course.course_code, "name": course.course_name,
+                                                   "lecturer": course.lecturer})
+
+    def search_students(self, query, limit=10, fuzzy=True):
+        return [(self.student_records[student_id], score) for student_id, score in self.student_index.search(query, limit, fuzzy)
+                if student_id in self.student_records]
+
+    def search_courses(self, query, limit=10, fuzzy=True):
+        return [(self.course_catalog[code], score) for code, score in self.course_index.search(query, limit, fuzzy)
+                if code in self.course_catalog]
+
+    def add_staff(self, staff_data):
+        try:
+            staff = Staff(
+                staff_id=staff_data["staff_id"],
+                name=staff_data["name"],
+                email=staff_data["email"],
+                department=staff_data.get("department", ""),
+                basic_salary=staff_data.get("basic_salary", 0),
+                position=staff_data.get("position", "")
+            )
+            for name, amount in staff_data.get("allowances", {}).items():
+                added, message = staff.add_allowance(name, amount)
+                if not added:
+                    return False, message
+            for name, amount in staff_data.get("deductions", {}).items():
+                added, message = staff.add_deduction(name, amount)
+                if not added:
+                    return False, message
+
+            if staff.staff_id in self.staff_records:
+                return False, f"Staff {staff.staff_id} already exists in records."
+
+            self.staff_records[staff.staff_id] = staff
+            self._publish(EventType.STAFF_ADDED, staff.staff_id, name=staff.name, department=staff.department)
+            return True, f"Staff {staff.staff_id} added successfully."
+        except Exception as e:
+            return False, f"Error adding staff: {e}"
+
+    def enroll_student_in_course(self, student_id, course_code, semester, lean=False):
+        result = self.enrollment_service.enroll_student(student_id, course_code, semester, lean=True)
+        if result:
+            enrollment = result.value
+            self.enrollment_records[f"{student_id}_{course_code}_{semester}"] = enrollment
+            self.enrollment_changes.append(enrollment)
+            self._publish(EventType.ENROLLED, student_id, course_code=course_code, semester=semester,
+                          enrollment_id=enrollment.enrollment_id)
+            return make_result(lean, Status.OK, "Enrollment successful. ID: {0}", enrollment.enrollment_id, value=enrollment)
+        if lean:
+            return result
+        return False, result.message
+
+    def withdraw_from_course(self, student_id, course_code, semester=None):
+        semester = semester or self.current_semester
+        enrollment = self.enrollment_records.get(f"{student_id}_{course_code}_{semester}")
+        if not enrollment:
+            return False, f"Enrollment for student {student_id} in course {course_code} not found."
+        success, message = self.enrollment_service.withdraw_enrollment(enrollment)
+        if success:
+            self._publish(EventType.WITHDRAWN, student_id, course_code=course_code, semester=semester,
+                          enrollment_id=enrollment.enrollment_id)
+        return success, message
+
+    def add_course_prerequisite(self, course_code, prerequisite_code):
+        success, message = self.prerequisite_graph.add_prerequisite(course_code, prerequisite_code)
+        if success:
+            self._publish(EventType.PREREQUISITE_ADDED, course_code, prerequisite=prerequisite_code)
+        return success, message
+
+    def check_enrollment_eligibility(self, student_id, course_code):
+        student = self.student_records.get(student_id)
+        if not student:
+            return False, f"Student {student_id} not found."
+        if course_code not in self.course_catalog:
+            return False, f"Course {course_code} not found."
+        missing = self.prerequisite_graph.missing_prerequisites(student, course_code)
+        if missing:
+            return False, f"Missing prerequisites for {course_code}: {', '.join(missing)}"
+        return True, f"Student {student_id} is eligible for {course_code}."
+
+    def set_program_requirements(self, program, course_codes):
+        success, message = self.prerequisite_graph.set_program_requirements(program, course_codes)
+        if success:
+            self._publish(EventType.REQUIREMENTS_SET, program, course_codes=list(course_codes))
+        return success, message
+
+    def run_degree_audit(self, program):
+        return self.prerequisite_graph.degree_audit(self.student_records, program)
 
     def assign_grade_to_enrollment(self, enrollment_id, grade):
-        return self.grading_service.assign_grade(enrollment_id, grade)
+        success, message = self.grading_service.assign_grade(enrollment_id, grade)
+        if success:
+            enrollment = self.enrollment_records[enrollment_id]
+            self._publish(EventType.GRADED, enrollment.student_id, course_code=enrollment.course_code, grade=grade,
+                          enrollment_id=enrollment.enrollment_id)
+        return success, message
 
-    def process_student_payment(self, student_id, amount, date_str):
-        return self.financial_service.process_payment(student_id, amount, date_str)
+    def process_student_payment(self, student_id, amount, date_str, lean=False):
+        result = self.financial_service.process_payment(student_id, amount, date_str, lean)
+        if self.events is not None and (result[0] if isinstance(result, tuple) else result):
+            self._publish(EventType.PAYMENT, student_id, amount=amount, date=date_str)
+        return result
 
     def add_asset(self, asset):
         try:
             if asset.asset_id in self.asset_records:
                 return False, f"Asset {asset.asset_id} already exists in records."
             self.asset_records[asset.asset_id] = asset
+            self._publish(EventType.ASSET_ADDED, asset.asset_id, type=asset.type, location=asset.location)
             return True, f"Asset {asset.asset_id} added successfully."
         except Exception as e:
             return False, f"Error adding asset: {e}"
@@ -700,48 +3561,271 @@ class CampusManagementSystem:
             student_id = grade_item["student_id"]
             grade = grade_item["grade"]
             
-            enrollment_key = f"{student_id}_{course_code}_2024A"   
+            enrollment_key = f"{student_id}_{course_code}_{self.current_semester}"
             enrollment = self.enrollment_records.get(enrollment_key)
             
             if enrollment:
-                self.grading_service.assign_grade(enrollment.enrollment_id, grade)
-                final_grade, _ = self.grading_service.calculate_final_grade(enrollment.enrollment_id)
-                
+                self.grading_service.assign_grade(enrollment_key, grade)
+                final_grade, _ = self.grading_service.calculate_final_grade(enrollment_key)
+                if final_grade is None:
+                    final_grade = grade
                 
                 student = self.student_records.get(student_id)
                 if student:
-                    student.completed_courses.append((course_code, final_grade))
+                    student.record_grade(course_code, self.current_semester, final_grade)
                     student.calculate_gpa()  
 
+                self._publish(EventType.GRADED, student_id, course_code=course_code, grade=final_grade,
+                              enrollment_id=enrollment.enrollment_id)
                 results.append((student_id, final_grade))
             else:
                 return False, f"Enrollment for student {student_id} in course {course_code} not found."
         
         return results, "Grades processed successfully"
 
-    def book_campus_asset(self, asset_id, user_id, start_time, end_time):
+    def close_semester(self, next_semester, next_term_tuition=None):
+        summary, message = self.rollover_service.close_semester(self.current_semester, next_term_tuition)
+        if summary is None:
+            return False, message
+        self.current_semester = next_semester
+        self.academic_analytics.reset()
+        if self.events is not None:
+            for student_id, amount in self.rollover_service.tuition_postings[summary["semester"]].items():
+                self._publish(EventType.TUITION_POSTED, student_id, amount=amount, semester=next_semester, source="rollover")
+        self._publish(EventType.SEMESTER_CLOSED, summary["semester"], next_semester=next_semester,
+                      archived=summary["archived"], tuition_posted=summary["tuition_posted"])
+        return summary, message
+
+    def get_archived_enrollments(self, semester):
+        return self.rollover_service.get_archived_enrollments(semester)
+
+    def set_term_dates(self, term_start, weeks=14, semester=None):
+        semester = semester or self.current_semester
+        success, message = self.attendance_service.set_term(semester, term_start, weeks)
+        if success:
+            self._publish(EventType.TERM_DATES_SET, semester, term_start=term_start, weeks=weeks)
+        return success, message
+
+    def ingest_attendance_log(self, filename, semester=None, grace_minutes=10):
+        semester = semester or self.current_semester
+        summary, message = self.attendance_service.ingest_card_log(filename, semester, grace_minutes)
+        if summary is None:
+            return False, message
+        self._publish(EventType.ATTENDANCE_INGESTED, semester, filename=filename, **summary)
+        return summary, message
+
+    def get_course_attendance(self, course_code, semester=None, as_of=None):
+        return self.attendance_service.course_attendance(course_code, semester or self.current_semester, as_of)
+
+    def update_attendance_records(self, semester=None, as_of=None):
+        semester = semester or self.current_semester
+        seen = len(self.enrollment_changes)
+        success, message = self.attendance_service.update_attendance_records(semester, as_of)
+        if self.events is not None:
+            for enrollment in self.enrollment_changes[seen:]:
+                self._publish(EventType.ATTENDANCE_UPDATED, enrollment.student_id, course_code=enrollment.course_code,
+                              semester=semester, attendance=enrollment.attendance_record)
+        return success, message
+
+    def issue_semester_invoices(self, semester=None, post=True):
+        semester = semester or self.current_semester
+        invoice_run, message = self.invoicing_service.run_invoicing(semester, post)
+        if invoice_run:
+            if post and self.events is not None:
+                for student, amount in zip(invoice_run.students, invoice_run.total.tolist()):
+                    self._publish(EventType.TUITION_POSTED, student.student_id, amount=amount, semester=semester,
+                                  source="invoice", invoice_run=invoice_run.sequence)
+            return True, message
+        return False, message
+
+    def get_student_invoice(self, student_id, semester=None):
+        return self.invoicing_service.get_invoice(student_id, semester or self.current_semester)
+
+    def get_student_invoices(self, student_id, semester=None):
+        return self.invoicing_service.get_invoices(student_id, semester or self.current_semester)
+
+    def store_invoices(self, filename, semester=None):
+        return self.invoicing_service.store_invoices(semester or self.current_semester, filename)
+
+    def run_monthly_payroll(self, month, year):
+        payroll_run, message = self.payroll_service.run_payroll(month, year)
+        if payroll_run:
+            self._publish(EventType.PAYROLL_RUN, payroll_run.period, staff=len(payroll_run.staff))
+            return True, message
+        return False, message
+
+    def store_payslips(self, period, filename):
+        return self.payroll_service.store_payslips(period, filename)
+
+    def generate_timetable(self, course_codes=None, lecturer_availability=None, apply=True):
+        result, message = self.timetable_solver.solve(course_codes, lecturer_availability)
+        if result is None:
+            return None, message
+        timetable, unscheduled = result
+        if apply:
+            success, apply_message = self.timetable_solver.apply(timetable)
+            if not success:
+                return None, apply_message
+            for code, (day, start_time, end_time, venue) in timetable.items():
+                self._publish(EventType.SCHEDULE_CHANGED, code, day=day, start_time=start_time, end_time=end_time,
+                              venue=venue)
+        if unscheduled:
+            message += f" Unscheduled: {', '.join(unscheduled)}"
+        return timetable, message
+
+    def export_timetables(self, filename, semester=None, fmt="csv", term_start=None):
+        return self.enrollment_service.export_timetables(filename, semester, fmt, term_start=term_start)
+
+    def book_campus_asset(self, asset_id, user_id, start_time, end_time, lean=False):
+        asset = self.asset_records.get(asset_id)
+        if not asset:
+            return make_result(lean, Status.NOT_FOUND, "Asset {0} not found.", asset_id)
+        result = asset.book_asset(user_id, start_time, end_time, lean)
+        if result[0] if isinstance(result, tuple) else result:
+            self._index_booking(asset.bookings[-1])
+        return result
+
+    def _index_booking(self, booking):
+        self.booking_records[booking['booking_id']] = booking
+        self.user_bookings.setdefault(booking['user_id'], []).append(booking['booking_id'])
+        self.asset_status_engine.track(booking['asset_id'], booking, 'booking')
+        self._publish(EventType.BOOKED, booking['booking_id'], asset_id=booking['asset_id'], user_id=booking['user_id'],
+                      start_time=booking['start_time'], end_time=booking['end_time'])
+
+    def check_in_booking(self, booking_id):
+        booking = self.booking_records.get(booking_id)
+        if not booking:
+            return False, f"Booking {booking_id} not found."
+        success, message = self.asset_records[booking['asset_id']].check_in(booking_id)
+        if success:
+            self._publish(EventType.CHECKED_IN, booking_id, asset_id=booking['asset_id'], user_id=booking['user_id'])
+        return success, message
+
+    def check_out_booking(self, booking_id, condition="GOOD"):
+        booking = self.booking_records.get(booking_id)
+        if not booking:
+            return False, f"Booking {booking_id} not found."
+        asset = self.asset_records[booking['asset_id']]
+        old_status = asset.status
+        success, message = asset.check_out(booking_id, condition)
+        if success:
+            self._publish(EventType.CHECKED_OUT, booking_id, asset_id=booking['asset_id'], user_id=booking['user_id'],
+                          condition=condition)
+            if asset.status != old_status:
+                self._publish(EventType.STATUS_CHANGED, asset.asset_id, old_status=old_status, new_status=asset.status)
+        return success, message
+
+    def get_user_bookings(self, user_id, status=None):
+        bookings = [self.booking_records[booking_id] for booking_id in self.user_bookings.get(user_id, [])]
+        if status:
+            bookings = [booking for booking in bookings if booking['status'] == status]
+        return bookings
+
+    def book_campus_assets(self, booking_requests):
+        by_asset = {}
+        for asset_id, user_id, start_time, end_time in booking_requests:
+            by_asset.setdefault(asset_id, []).append((user_id, start_time, end_time))
+
+        try:
+            for asset_id, requests in by_asset.items():
+                asset = self.asset_records.get(asset_id)
+                if not asset:
+                    return False, f"Asset {asset_id} not found."
+                for user_id, start_time, end_time in requests:
+                    if parse_datetime(start_time) >= parse_datetime(end_time):
+                        return False, f"Batch booking rejected: {start_time} to {end_time} must end after it starts."
+                conflicts = asset.find_conflicts([(start_time, end_time) for user_id, start_time, end_time in requests])
+                if conflicts:
+                    start_time, end_time = conflicts[0]
+                    return False, (f"Batch booking rejected: asset {asset_id} has {len(conflicts)} conflicting "
+                                   f"occurrence(s), first from {start_time} to {end_time}.")
+        except ValueError as e:
+            return False, f"Batch booking rejected: {e}"
+
+        for asset_id, requests in by_asset.items():
+            asset = self.asset_records[asset_id]
+            for user_id, start_time, end_time in requests:
+                self._index_booking(asset._add_booking(user_id, start_time, end_time))
+        return True, f"Booked {len(booking_requests)} occurrences across {len(by_asset)} assets."
+
+    def book_recurring_asset(self, asset_ids, user_id, start_time, end_time, freq="WEEKLY", count=None,
+                             until=None, interval=1, by_day=None):
+        if isinstance(asset_ids, str):
+            asset_ids = [asset_ids]
+        try:
+            occurrences = expand_recurrence(start_time, end_time, freq, count, until, interval, by_day)
+        except ValueError as e:
+            return False, f"Invalid recurrence: {e}"
+        return self.book_campus_assets([
+            (asset_id, user_id, occurrence_start, occurrence_end)
+            for asset_id in asset_ids for occurrence_start, occurrence_end in occurrences
+        ])
+
+    def schedule_asset_maintenance(self, asset_id, start_time, end_time, description):
         asset = self.asset_records.get(asset_id)
         if not asset:
             return False, f"Asset {asset_id} not found."
-        return asset.book_asset(user_id, start_time, end_time)
+        old_status = asset.status
+        success, message = asset.add_maintenance_record(start_time, end_time, description)
+        if success:
+            self.asset_status_engine.track(asset_id, asset.maintenance_records[-1], 'maintenance')
+            self._publish(EventType.MAINTENANCE_SCHEDULED, asset_id, start_time=start_time, end_time=end_time,
+                          description=description)
+            if asset.status != old_status:
+                self._publish(EventType.STATUS_CHANGED, asset_id, old_status=old_status, new_status=asset.status)
+        return success, message
+
+    def advance_asset_clock(self, now=None):
+        if self.asset_status_engine.clock is None:
+            transitions = self.asset_status_engine.load(now)
+        else:
+            transitions = self.asset_status_engine.advance(now)
+        for asset_id, old_status, new_status in transitions:
+            self._publish(EventType.STATUS_CHANGED, asset_id, old_status=old_status, new_status=new_status)
+        return transitions
+
+    def recompute_asset_status(self, at_time, apply=True):
+        old_statuses = None
+        if apply and self.events is not None:
+            old_statuses = {asset_id: asset.status for asset_id, asset in self.asset_records.items()}
+        statuses, summary = self.asset_status_engine.recompute_status_at(at_time, apply)
+        if old_statuses is not None:
+            for asset_id, status in statuses.items():
+                if old_statuses[asset_id] != status:
+                    self._publish(EventType.STATUS_CHANGED, asset_id, old_status=old_statuses[asset_id], new_status=status)
+        return statuses, summary
+
+    def get_maintenance_clashes(self):
+        return self.asset_status_engine.find_maintenance_clashes()
+
+    def generate_asset_analytics_report(self, hourly_rates=None, now=None):
+        return self.asset_analytics.generate_report(hourly_rates, now)
+
+    def generate_academic_analytics_report(self, gpa_threshold=2.0, attendance_threshold=75.0):
+        return self.academic_analytics.generate_report(gpa_threshold, attendance_threshold)
 
     def generate_student_report(self, student_id):
+        from types import MappingProxyType
+
         student = self.student_records.get(student_id)
         if not student:
             return False, f"Student {student_id} not found."
 
-        report = {
-            "student_id": student.student_id,  
-            "name": student.name,
-            "email": student.email,
-            "enrolled_courses": student.enrolled_courses,
-            "fees_paid": student.fees_paid,
-            "balance": student.balance,
-            "payment_history": student.payment_history,
-            "gpa": student.gpa,
-            "tuition_balance": student.tuition_balance,
-            "completed_courses": student.completed_courses
-        }
+        key = ("student", student_id)
+        report = self.report_cache.get(key, student.version)
+        if report is None:
+            report = self.report_cache.put(key, student.version, MappingProxyType({
+                "student_id": student.student_id,  
+                "name": student.name,
+                "email": student.email,
+                "enrolled_courses": tuple(student.enrolled_courses),
+                "fees_paid": student.fees_paid,
+                "balance": student.balance,
+                "payment_history": tuple(student.payment_history),
+                "gpa": student.gpa,
+                "tuition_balance": student.tuition_balance,
+                "completed_courses": tuple(student.completed_courses)
+            }))
         return True, report
 
     def generate_student_transcript(self, student_id):  
@@ -761,23 +3845,31 @@ class CampusManagementSystem:
         return transcript
 
     def generate_course_report(self, course_code):
+        from types import MappingProxyType
+
         course = self.course_catalog.get(course_code)
         if not course:
             return False, f"Course {course_code} not found."
 
-        report = {
-            "course_code": course.course_code,  
-            "course_name": course.course_name,
-            "lecturer": course.lecturer,
-            "current_enrollment": course.current_enrollment,
-            "schedule": course.schedule,
-            "fee": course.fee,
-            "credits": course.credits,
-            "max_capacity": course.max_capacity,
-            "available_seats": course.get_available_seats()
-        }
+        key = ("course", course_code)
+        report = self.report_cache.get(key, course.version)
+        if report is None:
+            report = self.report_cache.put(key, course.version, MappingProxyType({
+                "course_code": course.course_code,  
+                "course_name": course.course_name,
+                "lecturer": course.lecturer,
+                "current_enrollment": tuple(course.current_enrollment),
+                "schedule": tuple(course.schedule),
+                "fee": course.fee,
+                "credits": course.credits,
+                "max_capacity": course.max_capacity,
+                "available_seats": course.get_available_seats()
+            }))
         return True, report
 
+    def get_report_cache_metrics(self):
+        return self.report_cache.get_metrics()
+
     def store_system_data(self, filename):
         try:
             with open("system_data.txt", "w") as file:
@@ -791,84 +3883,55 @@ class CampusManagementSystem:
 
     def store_system_report(self, filename):
         try:
-            with open(self,"system_report.txt", "w") as file:
+            with open(filename, "w") as file:
                 file.write("Campus Management System Report\n")
                 file.write(f"Total Courses: {len(self.course_catalog)}\n")
                 file.write(f"Total Students: {len(self.student_records)}\n")
                 file.write(f"Total Enrollments: {len(self.enrollment_records)}\n")
                 file.write(f"Total Assets: {len(self.asset_records)}\n")
+            return f"System report stored in {filename}."
         except Exception as e:
             print(f"Error storing system report: {e}")        
 
     def store_course_report(self, course_code, filename):
-        course = self.course_catalog.get(course_code)
-        if not course:
+        if course_code not in self.course_catalog:
             return f"Course {course_code} not found."
-
+        rendered, message = self.report_engine.render("course_report", course_code)
         try:
-            with open("course_report.txt", "w") as file:
-                file.write(f"Course Report for {course.course_code}\n")
-                file.write(f"Course Name: {course.course_name}\n")
-                file.write(f"Lecturer: {course.lecturer}\n")
-                file.write(f"Current Enrollment: {len(course.current_enrollment)}\n")
-                file.write("Schedule:\n")
-                for day, start_time, end_time, venue in course.schedule:
-                    file.write(f"  {day}: {start_time} - {end_time} at {venue}\n")
-                file.write(f"Fee: {course.fee}\n")
-                file.write(f"Credits: {course.credits}\n")
-                file.write(f"Max Capacity: {course.max_capacity}\n")
-                file.write(f"Available Seats: {course.get_available_seats()}\n")
-            return f"Course report for {course.course_code} stored in {filename}."
+            with open(filename, "w") as file:
+                file.write(rendered)
+            return f"Course report for {course_code} stored in {filename}."
         except Exception as e:
             return f"Error storing course report: {e}"
+
     def store_student_report(self, student_id, filename):
-        student = self.student_records.get(student_id)
-        if not student:
+        if student_id not in self.student_records:
             return f"Student {student_id} not found."
-
+        rendered, message = self.report_engine.render("student_report", student_id)
         try:
-            with open("student_report.txt", "w") as file:
-                file.write(f"Student Report for {student.student_id}\n")
-                file.write(f"Name: {student.name}\n")
-                file.write(f"Email: {student.email}\n")
-                file.write(f"Program: {student.program}\n")
-                file.write(f"Admission Year: {student.admission_year}\n")
-                file.write(f"GPA: {student.gpa}\n")
-                file.write(f"Tuition Balance: ${student.tuition_balance:.2f}\n")
-                file.write("Enrolled Courses:\n")
-                for course_code in student.enrolled_courses:
-                    file.write(f"  {course_code}\n")
-                file.write("Completed Courses:\n")
-                for course_code, grade in student.completed_courses:
-                    file.write(f"  {course_code}: {grade}\n")
-                file.write(f"Fees Paid: {student.fees_paid}\n")
-                file.write(f"Balance: {student.balance}\n")
-                file.write("Payment History:\n")
-                for amount, date_str in student.payment_history:
-                    file.write(f"  {amount} on {date_str}\n")
-            return f"Student report for {student.student_id} stored in {filename}."
+            with open(filename, "w") as file:
+                file.write(rendered)
+            return f"Student report for {student_id} stored in {filename}."
         except Exception as e:
             return f"Error storing student report: {e}"
 
     def store_student_transcript(self, student_id, filename):
-        student = self.student_records.get(student_id)
-        if not student:
+        if student_id not in self.student_records:
             return f"Student {student_id} not found."
-
+        rendered, message = self.report_engine.render("student_transcript", student_id)
         try:
-            with open("student_transcript.txt", "w") as file:
-                file.write(f"Transcript for {student.name} (ID: {student.student_id})\n")
-                file.write(f"Program: {student.program}\n")
-                file.write(f"Admission Year: {student.admission_year}\n")
-                file.write(f"GPA: {student.gpa}\n")
-                file.write(f"Total Credits: {student.total_credits}\n")
-                file.write("Completed Courses:\n")
-                for course_code, grade in student.completed_courses:
-                    file.write(f"  {course_code}: {grade}\n")
-            return f"Student transcript for {student.student_id} stored in {filename}."
+            with open(filename, "w") as file:
+                file.write(rendered)
+            return f"Student transcript for {student_id} stored in {filename}."
         except Exception as e:
             return f"Error storing student transcript: {e}"
-                        
+
+    def store_reports(self, report_type, filename, keys=None, fmt="text", workers=1):
+        return self.report_engine.store_reports(report_type, filename, keys, fmt, workers)
+
+    def store_report_shards(self, report_type, directory, keys=None, fmt="text", workers=1):
+        return self.report_engine.store_report_shards(report_type, directory, keys, fmt, workers)
+
     def get_system_report(self):  
         return self.store_system_report("system_report.txt")
     
@@ -876,6 +3939,262 @@ class CampusManagementSystem:
         return self.store_system_data("system_data.txt")
 
 
+def _shard_reserve_seat(cms, student_id, course_code):
+    course = cms.course_catalog.get(course_code)
+    if not course:
+        return make_result(True, Status.NOT_FOUND, "Course {0} not found.", course_code)
+    return course.enroll_student(student_id, lean=True)
+
+def _shard_release_seat(cms, student_id, course_code):
+    course = cms.course_catalog.get(course_code)
+    if course and student_id in course.current_enrollment:
+        course.current_enrollment.remove(student_id)
+        course.version += 1
+        return True, f"Seat in {course_code} released for {student_id}."
+    return False, f"No seat in {course_code} held by {student_id}."
+
+def _shard_add_course_replica(cms, course_data):
+    import sys
+
+    added, message = cms.add_course(course_data)
+    if added:
+        cms.course_catalog[course_data["code"]].max_capacity = sys.maxsize
+    return added, message
+
+def _shard_stats(cms):
+    return {
+        "students": len(cms.student_records),
+        "courses": len(cms.course_catalog),
+        "enrollments": len(cms.enrollment_records)
+    }
+
+SHARD_OPERATIONS = {
+    "shard_stats": _shard_stats,
+    "reserve_seat": _shard_reserve_seat,
+    "release_seat": _shard_release_seat,
+    "add_course_replica": _shard_add_course_replica
+}
+
+SHARD_BATCH_ROUTES = {
+    "add_student": lambda args: args[0]["student_id"],
+    "enroll_student_in_course": lambda args: args[0],
+    "withdraw_from_course": lambda args: args[0],
+    "process_student_payment": lambda args: args[0],
+    "check_enrollment_eligibility": lambda args: args[0]
+}
+
+def _plain(value):
+    from types import MappingProxyType
+
+    if isinstance(value, MappingProxyType):
+        return {key: _plain(item) for key, item in value.items()}
+    if type(value) in (tuple, list):
+        return type(value)(_plain(item) for item in value)
+    return value
+
+def _campus_shard_worker(connection, shard):
+    Enrollment._id_prefix = f"ENR{shard:02d}"
+    cms = CampusManagementSystem()
+    while True:
+        message = connection.recv()
+        if message is None:
+            break
+        results = []
+        for name, args in message:
+            try:
+                if name in SHARD_OPERATIONS:
+                    results.append(SHARD_OPERATIONS[name](cms, *args))
+                else:
+                    results.append(getattr(cms, name)(*args))
+            except Exception as e:
+                results.append((False, f"Error in {name}: {e}"))
+        try:
+            connection.send(results)
+        except Exception:
+            # cached report snapshots are read-only mapping proxies, which do not pickle
+            try:
+                connection.send(_plain(results))
+            except Exception as e:
+                connection.send([(False, f"Error returning results: {e}")] * len(results))
+    connection.close()
+
+class ShardedCampusSystem:
+    def __init__(self, worker_count=2):
+        import multiprocessing
+
+        self.worker_count = max(1, worker_count)
+        self.department_shards = {}
+        self.course_shards = {}
+        self.connections = []
+        self.workers = []
+        for shard in range(self.worker_count):
+            parent, child = multiprocessing.Pipe()
+            worker = multiprocessing.Process(target=_campus_shard_worker, args=(child, shard), daemon=True)
+            worker.start()
+            child.close()
+            self.connections.append(parent)
+            self.workers.append(worker)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+    def close(self):
+        for connection in self.connections:
+            try:
+                connection.send(None)
+                connection.close()
+            except (OSError, BrokenPipeError):
+                pass
+        for worker in self.workers:
+            worker.join(timeout=5)
+        self.connections = []
+        self.workers = []
+        return True, "Shards stopped."
+
+    def shard_for_department(self, department):
+        shard = self.department_shards.get(department)
+        if shard is None:
+            shard = self.department_shards[department] = len(self.department_shards) % self.worker_count
+        return shard
+
+    def shard_for_student(self, student_id):
+        parts = student_id.split("-")
+        return self.shard_for_department(parts[1] if len(parts) == 4 else "")
+
+    def _dispatch(self, batches):
+        for shard, calls in batches.items():
+            self.connections[shard].send(calls)
+        return {shard: self.connections[shard].recv() for shard in batches}
+
+    def call_shard(self, shard, name, *args):
+        return self._dispatch({shard: [(name, args)]})[shard][0]
+
+    def broadcast(self, name, *args):
+        replies = self._dispatch({shard: [(name, args)] for shard in range(self.worker_count)})
+        return [replies[shard][0] for shard in range(self.worker_count)]
+
+    def add_course(self, course_data, department):
+        code = course_data.get("code")
+        if code in self.course_shards:
+            return False, f"Course {code} already exists in catalog."
+        home = self.shard_for_department(department)
+        batches = {shard: [("add_course" if shard == home else "add_course_replica", (course_data,))]
+                   for shard in range(self.worker_count)}
+        replies = self._dispatch(batches)
+        added, message = replies[home][0]
+        if added:
+            self.course_shards[code] = home
+        return added, message
+
+    def add_student(self, student_data):
+        return self.call_shard(self.shard_for_student(student_data["student_id"]), "add_student", student_data)
+
+    def _enroll_cross_shard(self, student_id, course_code, semester):
+        home = self.course_shards[course_code]
+        reserved = self.call_shard(home, "reserve_seat", student_id, course_code)
+        if not reserved:
+            return False, reserved.message
+        enrolled = self.call_shard(self.shard_for_student(student_id), "enroll_student_in_course", student_id, course_code, semester)
+        if not enrolled[0]:
+            self.call_shard(home, "release_seat", student_id, course_code)
+        return enrolled
+
+    def enroll_student_in_course(self, student_id, course_code, semester):
+        if course_code not in self.course_shards:
+            return False, f"Course {course_code} not found."
+        shard = self.shard_for_student(student_id)
+        if self.course_shards[course_code] == shard:
+            return self.call_shard(shard, "enroll_student_in_course", student_id, course_code, semester)
+        return self._enroll_cross_shard(student_id, course_code, semester)
+
+    def withdraw_from_course(self, student_id, course_code, semester=None):
+        if course_code not in self.course_shards:
+            return False, f"Course {course_code} not found."
+        shard = self.shard_for_student(student_id)
+        withdrawn = self.call_shard(shard, "withdraw_from_course", student_id, course_code, semester)
+        home = self.course_shards[course_code]
+        if withdrawn[0] and home != shard:
+            self.call_shard(home, "release_seat", student_id, course_code)
+        return withdrawn
+
+    def process_student_payment(self, student_id, amount, date_str):
+        return self.call_shard(self.shard_for_student(student_id), "process_student_payment", student_id, amount, date_str)
+
+    def process_grade_submission(self, lecturer_id, course_code, grade_data):
+        if course_code not in self.course_shards:
+            return False, f"Course {course_code} not found."
+        batches = {}
+        for grade_item in grade_data:
+            batches.setdefault(self.shard_for_student(grade_item["student_id"]), []).append(grade_item)
+        if not batches:
+            batches[self.course_shards[course_code]] = []
+        replies = self._dispatch({shard: [("process_grade_submission", (lecturer_id, course_code, items))]
+                                  for shard, items in batches.items()})
+        results = []
+        for shard in batches:
+            shard_results, message = replies[shard][0]
+            if shard_results is False:
+                return False, message
+            results.extend(shard_results)
+        return results, "Grades processed successfully"
+
+    def _run_phase(self, batches, positions, releases, results):
+        replies = self._dispatch(batches)
+        for shard, indexes in positions.items():
+            for index, result in zip(indexes, replies[shard]):
+                results[index] = result
+        release_batches = {}
+        for index, home, student_id, course_code in releases:
+            if results[index][0]:
+                release_batches.setdefault(home, []).append(("release_seat", (student_id, course_code)))
+        if release_batches:
+            self._dispatch(release_batches)
+        batches.clear()
+        positions.clear()
+        releases.clear()
+
+    def execute_batch(self, operations):
+        """Run routed (name, args) operations concurrently across shards, keeping results in input order.
+        The batch is split into phases at each cross-shard enroll or withdraw so effects keep input order."""
+        batches = {}
+        positions = {}
+        releases = []
+        results = [None] * len(operations)
+        for index, (name, args) in enumerate(operations):
+            route = SHARD_BATCH_ROUTES.get(name)
+            if route is None:
+                results[index] = (False, f"Operation {name} cannot be routed to a shard.")
+                continue
+            shard = self.shard_for_student(route(args))
+            if name in ("enroll_student_in_course", "withdraw_from_course"):
+                course_code = args[1]
+                if course_code not in self.course_shards:
+                    results[index] = (False, f"Course {course_code} not found.")
+                    continue
+                home = self.course_shards[course_code]
+                if home != shard:
+                    if name == "enroll_student_in_course":
+                        if batches:
+                            self._run_phase(batches, positions, releases, results)
+                        results[index] = self._enroll_cross_shard(*args)
+                        continue
+                    batches.setdefault(shard, []).append((name, args))
+                    positions.setdefault(shard, []).append(index)
+                    releases.append((index, home, args[0], course_code))
+                    self._run_phase(batches, positions, releases, results)
+                    continue
+            batches.setdefault(shard, []).append((name, args))
+            positions.setdefault(shard, []).append(index)
+        if batches:
+            self._run_phase(batches, positions, releases, results)
+        return results
+
+    def get_shard_stats(self):
+        return self.broadcast("shard_stats")
+
 def demonstrate_system():
     """Demonstrate the campus management system in action"""
     print("=" * 60)
@@ -918,7 +4237,7 @@ def demonstrate_system():
         print(f"  {message}")
         
         # Add schedule to CSE101
-        if course_data["code"] == "CSE101":
+        if course_data.get("code") == "CSE101":
             cse101 = cms.course_catalog["CSE101"]
             success, msg = cse101.add_schedule("Mon", "10:00", "11:30", "ROOM_101")
             if success:
@@ -985,7 +4304,7 @@ def demonstrate_system():
     
     
     print("\n6. SYSTEM REPORT:")
-    report = cms.store_system_report()
+    report = cms.store_system_report("system_report.txt")
     
     print(report)
     
@@ -996,6 +4315,58 @@ def demonstrate_system():
     return cms
 
 
+def run_business_rule_tests():
+    """Check the core business rules against a fresh system"""
+    print("\n" + "=" * 60)
+    print("BUSINESS RULE TESTS")
+    print("=" * 60)
+
+    cms = CampusManagementSystem()
+    cms.add_course({"code": "CSE301", "title": "Operating Systems", "instructor": "DR_SMITH", "max_capacity": 1})
+    cms.add_student({"student_id": "PCOS-01-01-0101", "name": "Carol", "email": "carol@picos.edu", "admission_year": 2024})
+    cms.add_student({"student_id": "PCOS-01-01-0102", "name": "Dan", "email": "dan@picos.edu", "admission_year": 2024})
+    lab = Assets("LAB_01", "Computer Lab", "LAB", "Block A", capacity=40)
+    cms.add_asset(lab)
+
+    checks = [
+        ("Rejects invalid student ID", not validate_student_id("PCOS-01-02-0001")[0]),
+        ("Rejects non-campus email", not validate_student_email("carol@gmail.com")[0]),
+        ("Rejects invalid course code", not validate_course_code("cs101")[0]),
+        ("Enrolls student", cms.enroll_student_in_course("PCOS-01-01-0101", "CSE301", "2024A")[0]),
+        ("Rejects duplicate enrollment", not cms.enroll_student_in_course("PCOS-01-01-0101", "CSE301", "2024A")[0]),
+        ("Rejects enrollment in full course", not cms.enroll_student_in_course("PCOS-01-01-0102", "CSE301", "2024A")[0]),
+        ("Rejects non-positive payment", not cms.process_student_payment("PCOS-01-01-0101", 0, "01-09-2024")[0]),
+        ("Accepts payment", cms.process_student_payment("PCOS-01-01-0101", 5000, "01-09-2024")[0]),
+        ("Rejects class over 3 hours", not cms.course_catalog["CSE301"].add_schedule("Monday", "08:00", "12:00", "LAB_01")[0]),
+        ("Books free asset", cms.book_campus_asset("LAB_01", "PCOS-01-01-0101", "01-09-2024 10:00", "01-09-2024 12:00")[0]),
+        ("Rejects overlapping booking", not cms.book_campus_asset("LAB_01", "PCOS-01-01-0102", "01-09-2024 11:00", "01-09-2024 13:00")[0]),
+        ("Rejects grades from unassigned lecturer", not cms.process_grade_submission("DR_JONES", "CSE301", [])[0])
+    ]
+
+    results, message = cms.process_grade_submission("DR_SMITH", "CSE301", [{"student_id": "PCOS-01-01-0101", "grade": "A"}])
+    checks.append(("Grade submission updates GPA", bool(results) and cms.student_records["PCOS-01-01-0101"].gpa == 4.0))
+
+    cms.add_course({"code": "CSE401", "title": "Distributed Systems", "instructor": "DR_SMITH", "prerequisites": ["CSE301"]})
+    checks.append(("Rejects enrollment without prerequisites", not cms.enroll_student_in_course("PCOS-01-01-0102", "CSE401", "2024B")[0]))
+    checks.append(("Enrolls student with prerequisites", cms.enroll_student_in_course("PCOS-01-01-0101", "CSE401", "2024B")[0]))
+
+    with ShardedCampusSystem(worker_count=2) as sharded:
+        sharded.add_course({"code": "MAT101", "title": "Calculus I", "instructor": "DR_JOHNSON", "max_capacity": 5}, "MATH")
+        sharded.add_student({"student_id": "PCOS-01-01-0001", "name": "Alice", "email": "alice@picos.edu", "admission_year": 2024})
+        batch = sharded.execute_batch([
+            ("enroll_student_in_course", ("PCOS-01-01-0001", "MAT101", "2024A")),
+            ("withdraw_from_course", ("PCOS-01-01-0001", "MAT101", "2024A"))
+        ])
+        checks.append(("Sharded batch keeps enroll before withdraw", all(result[0] for result in batch)))
+
+    passed = 0
+    for name, ok in checks:
+        print(f"  {'PASS' if ok else 'FAIL'}: {name}")
+        passed += ok
+    print(f"\n  {passed}/{len(checks)} business rules passed")
+    return passed == len(checks)
+
+
 if __name__ == "__main__":
     # Run demonstration
     cms = demonstrate_system()